@@ -9,6 +9,8 @@ from tkinter import ttk, filedialog, messagebox, colorchooser
 from PIL import Image, ImageTk
 import os
 import json
+import html
+import urllib.parse
 import shutil
 import fnmatch
 from pathlib import Path
@@ -16,8 +18,26 @@ import csv
 from typing import List, Any, Optional
 import subprocess
 import sys
-from datetime import datetime
+from datetime import datetime, timedelta
 import random
+import queue
+import threading
+import itertools
+import re
+import time
+import mmap
+import codecs
+import zipfile
+import tarfile
+import mimetypes
+import importlib
+import functools
+import stat
+from types import MappingProxyType
+import sqlite3
+import io
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 
 
 # Constants
@@ -49,6 +69,72 @@ A versatile tool designed to help you organize files and folders efficiently.
 • Detailed reports on sorting activities
 GitHub: [Mohsyn](https://github.com/mohsyn)"""
 
+# Background scanning
+SCAN_BATCH_SIZE = 500       # items handed to the UI per queue message
+SCAN_WORKERS = 4            # threads walking top-level subtrees in recursive scans
+SCAN_MTIME_SLACK = 2.0      # folders modified this close to a scan are listed again on rescan
+SCAN_POLL_MS = 50           # how often the Tk thread drains the scan queue
+SCAN_MAX_BATCHES_PER_POLL = 20
+IMPORT_SNIFF_BYTES = 64 * 1024  # sample used to guess encoding and CSV dialect
+
+# Watch mode
+WATCH_POLL_MS = 500          # how often the Tk thread checks the watcher
+WATCH_SETTLE_SECONDS = 1.0   # wait for a burst of file events to go quiet before rescanning
+WATCH_POLL_SECONDS = 5.0     # rescan interval when no native watcher (watchdog) is available
+
+# Session loading
+SESSION_LOAD_WORKERS = 8     # threads checking that session files still exist
+SESSION_LOAD_CHUNK = 500
+SESSION_DB_EXTENSION = ".sortdb"  # SQLite sessions; anything else is saved as JSON
+
+# Autosave journal
+JOURNAL_COMPACT_RECORDS = 5000  # journal records before folding them into a new snapshot
+
+# Filtering
+FILTER_DEBOUNCE_MS = 150    # delay after the last keystroke before re-filtering
+SIZE_UNITS = {'': 1, 'b': 1, 'k': 1024, 'kb': 1024, 'm': 1024 ** 2, 'mb': 1024 ** 2,
+              'g': 1024 ** 3, 'gb': 1024 ** 3}
+
+# Preview cache
+PREVIEW_CACHE_BYTES = 256 * 1024 * 1024  # in-memory budget for decoded previews
+PHOTO_CACHE_BYTES = 64 * 1024 * 1024     # Tk photo images of fitted previews (Tk thread only)
+PREVIEW_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp')
+TEXT_PREVIEW_HEAD_BYTES = 8192  # bytes mapped from the start of a text file
+TEXT_PREVIEW_TAIL_BYTES = 2048  # bytes mapped from the end of log-like files
+TEXT_PREVIEW_CHARS = 1500
+TEXT_PREVIEW_TAIL_EXTENSIONS = ('.log', '.out', '.err')
+HEX_PREVIEW_BYTES = 512
+ARCHIVE_PREVIEW_ENTRIES = 200
+CSV_PREVIEW_ROWS = 40
+CSV_PREVIEW_COLUMN_WIDTH = 24
+PREVIEW_PROGRESSIVE = True  # show a quick low-quality decode first, then refine
+PREVIEW_QUICK_DIVISOR = 4   # quick decode size relative to the full preview
+PREVIEW_RESIZE_SETTLE_MS = 150  # full-quality redraw once configure events stop
+PREVIEW_LIVE_RESIZE_MS = 40     # minimum gap between cheap redraws during a drag
+PREFETCH_AHEAD = 4          # upcoming items decoded in the background
+PREFETCH_BEHIND = 1         # previous items kept warm for Left/Backspace
+PREFETCH_WORKERS = 2
+PREVIEW_POLL_MS = 30        # how often the Tk thread checks for a pending preview
+
+# Persistent thumbnail cache (shared across sessions)
+THUMBNAIL_MAX_SIZE = 640               # longest side of stored thumbnails
+THUMBNAIL_QUALITY = 85
+THUMBNAIL_CACHE_BYTES = 512 * 1024 * 1024
+THUMBNAIL_EVICT_RATIO = 0.9            # evict down to this fraction of the limit
+THUMBNAIL_WARMUP_POLL_MS = 200
+
+# Export
+EXPORT_BUFFER_BYTES = 1024 * 1024  # write buffer of the export file
+EXPORT_PROGRESS_ITEMS = 2000       # items between progress updates
+EXPORT_POLL_MS = 100
+EXPORT_BATCH_ITEMS = 50000         # rows per Parquet row group
+REPORT_SHARD_ITEMS = 1000          # items per data file (and page) of a paged HTML report
+REPORT_ROW_HEIGHT = 44             # px per row in the report's virtual list
+
+# Virtual item list
+VIRTUAL_OVERSCAN = 2        # extra rows materialized below the viewport
+VIRTUAL_DEFAULT_ROW_HEIGHT = 20
+
 type_map = {
             'image': ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.svg'],
             'text': ['.txt', '.md', '.py', '.js', '.html', '.css', '.json', '.xml', '.b4a','.b4j','.b4i','.log','.nfo','.java', '.c', '.cpp', '.h', '.hpp', '.cs', '.go', '.rb', '.php', '.swift', '.kt', '.kts'],
@@ -67,8 +153,22 @@ type_map = {
         }
 
 
+# Extensions previewed as text without sniffing; anything else is sniffed
+PREVIEW_TEXT_EXTENSIONS = frozenset(
+    type_map['text'] + type_map['configuration'] + type_map['script'] + [
+        '.csv', '.tsv', '.rst', '.tex', '.srt', '.vtt', '.properties', '.env', '.gitignore',
+        '.out', '.err', '.diff', '.patch', '.ts', '.tsx', '.jsx', '.vue', '.scss', '.less',
+        '.rs', '.lua', '.pl', '.r', '.m', '.scala', '.dart', '.ex', '.exs', '.erl', '.hs',
+        '.clj', '.groovy', '.gradle', '.cmake', '.mk', '.makefile', '.dockerfile', '.reg',
+        '.inf', '.nfo', '.asm', '.s', '.f90', '.jl', '.bas', '.vb', '.pas', '.sln', '.csproj'])
+
+PREVIEW_VIDEO_EXTENSIONS = tuple(type_map['video']) + ('.m4v', '.mpg', '.mpeg', '.3gp', '.ogv')
+PREVIEW_ARCHIVE_EXTENSIONS = ('.zip', '.tar', '.tgz', '.tbz2', '.txz', '.gz', '.bz2', '.xz', '.jar', '.apk', '.whl')
+
 def get_random_color(): return random.choice(COLOR_PALETTE)
 
+_item_ids = itertools.count(1)  # Stable per-process ids, used as Treeview iids
+
 def configure_dark_theme(root):
     """Configure dark theme for the application."""
     style = ttk.Style()
@@ -120,46 +220,2290 @@ def configure_dark_theme(root):
     
     root.configure(bg=DARK_COLORS['bg'])
 
+_NO_ATTRIBUTES = MappingProxyType({})
+
 class FileItem:
-    def __init__(self, path):
+    """One file, folder or imported list entry.
+
+    Items use __slots__ to stay small at millions of rows: the modification
+    time is kept as a float epoch (``mtime``) with ``modified`` as a datetime
+    view, extensions are interned, and the ``attributes`` dict only exists
+    for items that have attributes (assign a new dict to set them).
+    """
+    __slots__ = ('uid', 'name', 'path', 'is_file', 'size', 'mtime', 'extension',
+                 'selected', 'bucket', '_attributes', 'skipped')
+
+    def __init__(self, path, populate=True):
+        self.uid = next(_item_ids)
         self.name = path
         self.path = path
         self.is_file = False
         self.size = 0
-        self.modified = datetime.now()
+        self.mtime = time.time()
         self.extension = ""
         self.selected = False
         self.bucket = None
-        self.attributes = {}
+        self._attributes = None
         self.skipped = False
-        self._populate_metadata()
+        if populate:
+            self._populate_metadata()
+
+    @property
+    def modified(self):
+        return datetime.fromtimestamp(self.mtime)
+
+    @modified.setter
+    def modified(self, value):
+        self.mtime = value.timestamp()
+
+    @property
+    def attributes(self):
+        return self._attributes if self._attributes is not None else _NO_ATTRIBUTES
+
+    @attributes.setter
+    def attributes(self, value):
+        self._attributes = dict(value) if value else None
+
+    @classmethod
+    def from_dir_entry(cls, entry):
+        """Build an item from an os.scandir entry using a single stat call."""
+        item = cls(entry.path, populate=False)
+        item.name = entry.name
+        try:
+            item.is_file = entry.is_file()
+            st = entry.stat()
+            if item.is_file:
+                item.size = st.st_size
+                item.extension = sys.intern(os.path.splitext(entry.name)[1].lower())
+            item.mtime = st.st_mtime
+        except (OSError, ValueError):
+            pass
+        return item
     
     def _populate_metadata(self):
         """Populate metadata from actual file if path exists."""
+        if self.refresh_metadata():
+            self.name = os.path.basename(os.path.normpath(self.path)) or self.path
+
+    def refresh_metadata(self):
+        """Stat the path and update is_file/size/extension/mtime (name is kept).
+
+        Returns False, leaving the item unchanged, if the path does not exist.
+        """
         try:
-            path = Path(self.path)
-            if path.exists():
-                self.name = path.name
-                self.is_file = path.is_file()
-                if self.is_file:
-                    self.size = path.stat().st_size
-                    self.extension = path.suffix.lower()
-                self.modified = datetime.fromtimestamp(path.stat().st_mtime)
-        except (OSError, PermissionError, ValueError):
-            pass
+            st = os.stat(self.path)
+        except (OSError, ValueError):
+            return False
+        self.is_file = stat.S_ISREG(st.st_mode)
+        if self.is_file:
+            self.size = st.st_size
+            self.extension = sys.intern(os.path.splitext(self.path)[1].lower())
+        self.mtime = st.st_mtime
+        return True
         
     def __str__(self):
         return f"{self.name} ({self.size} bytes, {self.modified.strftime('%Y-%m-%d %H:%M')})"
 
+class OrderedItemSet:
+    """Insertion-ordered set of FileItems with O(1) add, discard and membership."""
+    def __init__(self, items=()):
+        self._items = dict.fromkeys(items)
+
+    def add(self, item):
+        self._items[item] = None
+
+    def discard(self, item):
+        self._items.pop(item, None)
+
+    def clear(self):
+        self._items.clear()
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __len__(self):
+        return len(self._items)
+
 class Bucket:
     """Represents a sorting bucket."""
     def __init__(self, number: int, name: str = "", color: Optional[str] = None):
         self.number = number
         self.name = name or f"Bucket {number}"
         self.color = color or get_random_color()
-        self.items: List[FileItem] = []
+        self.items = OrderedItemSet()
         self.hotkey = str(number) if number < 10 else "0"
 
+class ItemModel:
+    """Ordered collection of the loaded FileItems.
+
+    ``generation`` changes whenever the collection is cleared or items are
+    removed, so caches keyed on it may assume the list only grew at the end
+    in between.
+
+    The model also owns the selection index: a set of selected items plus an
+    ordered list and position map that are kept in step as items are selected
+    at the end of the list and rebuilt lazily otherwise. Selection changes
+    must go through set_selected/select_many (or be made before the item is
+    appended) so the index stays in sync.
+    Items get a fresh ``uid`` when appended, so ``uid`` order is list order
+    even when batches arrive from several scan threads. ``paths`` maps each
+    path to its item and is kept up to date the same way (read only).
+    """
+    def __init__(self):
+        self.items: List[FileItem] = []
+        self.generation = 0
+        self._by_uid = {}
+        self.paths = {}
+        self._selected = set()
+        self._ordered: Optional[List[FileItem]] = []
+        self._positions = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def append(self, item):
+        item.uid = next(_item_ids)
+        self.items.append(item)
+        self._by_uid[item.uid] = item
+        self.paths[item.path] = item
+        if item.selected:
+            self._add_selected(item)
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def clear(self):
+        self.items.clear()
+        self.generation += 1
+        self._by_uid.clear()
+        self.paths.clear()
+        self._selected.clear()
+        self._ordered = []
+        self._positions = {}
+
+    def remove(self, items):
+        """Remove items (e.g. files gone after a rescan), keeping the rest in order."""
+        doomed = set(items)
+        if not doomed:
+            return
+        self.items = [item for item in self.items if item not in doomed]
+        self.generation += 1
+        for item in doomed:
+            self._by_uid.pop(item.uid, None)
+            if self.paths.get(item.path) is item:
+                del self.paths[item.path]
+            if item in self._selected:
+                self._selected.discard(item)
+                self._ordered = None
+
+    def get(self, uid) -> Optional[FileItem]:
+        """Look up an item by its uid (or Treeview iid string)."""
+        try:
+            return self._by_uid.get(int(uid))
+        except (TypeError, ValueError):
+            return None
+
+    @property
+    def selected_count(self):
+        return len(self._selected)
+
+    def set_selected(self, item, selected):
+        """Select or deselect one item, updating the selection index."""
+        if item.selected == selected:
+            return
+        item.selected = selected
+        if selected:
+            self._add_selected(item)
+        else:
+            self._selected.discard(item)
+            ordered = self._ordered
+            if ordered is not None and ordered and ordered[-1] is item:
+                ordered.pop()
+                del self._positions[item]
+            else:
+                self._ordered = None
+
+    def select_many(self, items, selected=True):
+        """Apply one selection state to many items with a single index rebuild."""
+        for item in items:
+            if item.selected != selected:
+                item.selected = selected
+                if selected:
+                    self._selected.add(item)
+                else:
+                    self._selected.discard(item)
+                self._ordered = None
+
+    def _add_selected(self, item):
+        self._selected.add(item)
+        ordered = self._ordered
+        if ordered is not None and (not ordered or ordered[-1].uid < item.uid):
+            self._positions[item] = len(ordered)
+            ordered.append(item)
+        else:
+            self._ordered = None
+
+    def selected_items(self) -> List[FileItem]:
+        """Selected items in list order. Do not modify the returned list."""
+        if self._ordered is None:
+            self._ordered = sorted(self._selected, key=lambda item: item.uid)
+            self._positions = {item: i for i, item in enumerate(self._ordered)}
+        return self._ordered
+
+    def selected_position(self, item) -> Optional[int]:
+        """Index of a selected item within selected_items(), or None."""
+        self.selected_items()
+        return self._positions.get(item)
+
+class ItemFilter:
+    """Compiled form of the Phase 1 filter text.
+
+    Terms are separated by ';'. A plain term is a case-insensitive wildcard
+    pattern and an item is shown if any of them match. A term starting with
+    '!' excludes matches, 're:' makes a term a regular expression (searched
+    anywhere in the name, case-insensitively), and 'size>10MB', 'size<=1k',
+    'modified>2024-01-01' or 'date<2024-06-30' add size/date conditions
+    that must all hold. An invalid regular expression is matched as plain
+    text and reported in ``errors``.
+    """
+    _predicate_re = re.compile(r'^(size|modified|date)\s*(<=|>=|<|>|=)\s*(.+)$', re.IGNORECASE)
+
+    def __init__(self, text):
+        self.text = text.strip()
+        self.include_terms = []
+        self.exclude_terms = set()
+        self.predicate_terms = set()
+        self._predicates = []
+        self.errors = []
+        include, exclude = ([], []), ([], [])
+        for term in (t.strip() for t in self.text.split(';')):
+            if not term:
+                continue
+            negate = term.startswith('!')
+            if negate:
+                term = term[1:].strip()
+                if not term:
+                    continue
+            predicate = None if negate else self._parse_predicate(term)
+            if predicate is not None:
+                self.predicate_terms.add(term.lower())
+                self._predicates.append(predicate)
+            elif negate:
+                self.exclude_terms.add(term.lower())
+                self._add_term(term, *exclude)
+            else:
+                self.include_terms.append(term.lower())
+                self._add_term(term, *include)
+        self._include = self._matcher(*include)
+        self._exclude = self._matcher(*exclude)
+
+    def _add_term(self, term, globs, searches):
+        """Add a term as a wildcard source or as its own compiled regex search."""
+        if term.lower().startswith('re:'):
+            source = term[3:]
+            try:
+                searches.append(re.compile(source, re.IGNORECASE).search)
+            except re.error as e:
+                self.errors.append(f"invalid regex '{source}': {e}")
+                searches.append(re.compile(re.escape(source.lower())).search)  # Match literally
+        else:
+            globs.append(f'(?:{fnmatch.translate(term.lower())})')
+
+    @staticmethod
+    def _matcher(globs, searches):
+        """One callable matching a lower-cased name against any of the terms."""
+        tests = ([re.compile('|'.join(globs)).match] if globs else []) + searches
+        if len(tests) <= 1:
+            return tests[0] if tests else None
+        return lambda name: any(test(name) for test in tests)
+
+    @classmethod
+    def _parse_predicate(cls, term):
+        m = cls._predicate_re.match(term)
+        if not m:
+            return None
+        field, op, value = m.group(1).lower(), m.group(2), m.group(3).strip().lower()
+        compare = {'<': lambda a, b: a < b, '<=': lambda a, b: a <= b, '>': lambda a, b: a > b,
+                   '>=': lambda a, b: a >= b, '=': lambda a, b: a == b}[op]
+        if field == 'size':
+            num = re.match(r'^(\d+(?:\.\d+)?)\s*([kmg]?b?)$', value)
+            if not num:
+                return None
+            limit = float(num.group(1)) * SIZE_UNITS[num.group(2)]
+            return lambda item: compare(item.size, limit)
+        try:
+            day = datetime.strptime(value, '%Y-%m-%d')
+        except ValueError:
+            return None
+        # A date means the whole local day [start, end)
+        start, end = day.timestamp(), (day + timedelta(days=1)).timestamp()
+        if op == '=':
+            return lambda item: start <= item.mtime < end
+        if op == '<=':
+            return lambda item: item.mtime < end
+        if op == '>':
+            return lambda item: item.mtime >= end
+        return lambda item: compare(item.mtime, start)
+
+    @property
+    def is_empty(self):
+        return self._include is None and self._exclude is None and not self._predicates
+
+    def matches(self, name_lower, item):
+        """Check an item given its cached lower-cased name."""
+        if self._include is not None and not self._include(name_lower):
+            return False
+        if self._exclude is not None and self._exclude(name_lower):
+            return False
+        return all(predicate(item) for predicate in self._predicates)
+
+    def narrows(self, previous):
+        """True if everything this filter matches is also matched by ``previous``.
+
+        Holds when the user only appended to a trailing-wildcard pattern (for
+        example ``*`` -> ``*.jp*``) or added exclusions and conditions.
+        """
+        if not (previous.exclude_terms <= self.exclude_terms
+                and previous.predicate_terms <= self.predicate_terms):
+            return False
+        if not previous.include_terms:
+            return True
+        if len(previous.include_terms) != 1 or len(self.include_terms) != 1:
+            return previous.include_terms == self.include_terms
+        before, after = previous.include_terms[0], self.include_terms[0]
+        if before == after:
+            return True
+        return (before.endswith('*') and after.startswith(before[:-1])
+                and not any(t.startswith('re:') or '[' in t for t in (before, after)))
+
+class FilterIndex:
+    """Caches lower-cased item names and the last filter result.
+
+    Items appended since the last call are filtered on their own, and a
+    filter that narrows the previous one only re-checks the previous matches.
+    """
+    def __init__(self):
+        self._generation = None
+        self._keys = []
+        self._last_filter = None
+        self._last_positions = []
+        self._last_size = 0
+
+    def filter(self, model, item_filter):
+        """Return the items of ``model`` matched by ``item_filter``, in order."""
+        if model.generation != self._generation:
+            self._generation = model.generation
+            self._keys = []
+            self._last_filter = None
+        items = model.items
+        keys = self._keys
+        if len(keys) < len(items):
+            keys.extend(item.name.lower() for item in items[len(keys):])
+
+        if item_filter.is_empty:
+            positions = range(len(items))
+        else:
+            matches = item_filter.matches
+            last = self._last_filter
+            if last is not None and item_filter.narrows(last):
+                positions = [i for i in self._last_positions if matches(keys[i], items[i])]
+                start = self._last_size
+            else:
+                positions = []
+                start = 0
+            positions.extend(i for i in range(start, len(items)) if matches(keys[i], items[i]))
+
+        self._last_filter = item_filter
+        self._last_positions = positions
+        self._last_size = len(items)
+        return [items[i] for i in positions]
+
+def image_nbytes(img):
+    """Approximate in-memory size of a PIL image."""
+    return img.width * img.height * len(img.getbands())
+
+def fit_size(size, max_size):
+    """Largest size with the same aspect ratio that fits max_size x max_size, never upscaled."""
+    width, height = size
+    scale = min(max_size / max(width, 1), max_size / max(height, 1), 1.0)
+    return max(1, int(width * scale)), max(1, int(height * scale))
+
+def load_preview_source(path, max_size, quick=False):
+    """Decode an image at roughly max_size x max_size.
+
+    JPEGs are DCT-scaled while decoding (Image.draft) and other formats are
+    shrunk with reduce() before the final resample, so a camera photo is
+    never held at full resolution. ``quick`` decodes at a fraction of the
+    size with a cheap filter for an immediate low-quality render.
+
+    Returns (image, original_size). Safe to call from worker threads.
+    """
+    if quick:
+        max_size = max(1, max_size // PREVIEW_QUICK_DIVISOR)
+    with Image.open(path) as img:
+        original_size = img.size
+        target = fit_size(original_size, max_size)
+        img.draft(None, target)
+        img.load()
+    factor = min(img.width // target[0], img.height // target[1])
+    if factor >= 2:
+        try:
+            img = img.reduce(factor)
+        except ValueError:
+            pass  # Mode without reduce() support (e.g. palette images)
+    if img.size != target:
+        img = img.resize(target, Image.BILINEAR if quick else Image.LANCZOS)
+    return img, original_size
+
+_TEXT_BOMS = ((codecs.BOM_UTF32_LE, 'utf-32'), (codecs.BOM_UTF32_BE, 'utf-32'),
+              (codecs.BOM_UTF8, 'utf-8-sig'), (codecs.BOM_UTF16_LE, 'utf-16'),
+              (codecs.BOM_UTF16_BE, 'utf-16'))
+# Codec and code-unit size for decoding from the middle of a file (no BOM there)
+_TEXT_BOM_TAIL_CODECS = ((codecs.BOM_UTF32_LE, 'utf-32-le', 4), (codecs.BOM_UTF32_BE, 'utf-32-be', 4),
+                         (codecs.BOM_UTF8, 'utf-8', 1), (codecs.BOM_UTF16_LE, 'utf-16-le', 2),
+                         (codecs.BOM_UTF16_BE, 'utf-16-be', 2))
+_TEXT_CONTROL_BYTES = bytes(b for b in range(32) if b not in b'\t\n\r\f\b\x1b')
+
+def sniff_text_encoding(data, assume_text=False):
+    """Guess the encoding of a byte sample; None means it looks binary.
+
+    With ``assume_text`` (a known text extension) only NUL bytes mark a file
+    as binary; otherwise more than 10% control characters do too.
+    """
+    for bom, encoding in _TEXT_BOMS:
+        if data.startswith(bom):
+            return encoding
+    if b'\x00' in data:
+        return None
+    if not assume_text and len(data.translate(None, _TEXT_CONTROL_BYTES)) < len(data) * 0.9:
+        return None
+    try:
+        codecs.getincrementaldecoder('utf-8')().decode(data, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    try:
+        data.decode('cp1252')
+        return 'cp1252'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+def format_hex_dump(data, width=16):
+    """Classic offset / hex / ASCII dump of a byte string."""
+    lines = []
+    for offset in range(0, len(data), width):
+        chunk = data[offset:offset + width]
+        hex_part = ' '.join(f'{b:02x}' for b in chunk)
+        ascii_part = ''.join(chr(b) if 32 <= b < 127 else '.' for b in chunk)
+        lines.append(f'{offset:08x}  {hex_part:<{width * 3 - 1}}  |{ascii_part}|')
+    return '\n'.join(lines)
+
+def read_text_preview(path, head_bytes=TEXT_PREVIEW_HEAD_BYTES, tail_bytes=0, assume_text=False):
+    """Preview a file through mmap, touching only its head (and optionally tail).
+
+    Returns ('text', str) for text, decoded with a sniffed encoding, or
+    ('hex', str) with a hex dump when the file looks binary.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return 'text', ''
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            head = mm[:head_bytes]
+            tail_start = max(head_bytes, size - tail_bytes)
+            tail = mm[tail_start:] if tail_bytes and tail_start < size else b''
+
+    encoding = sniff_text_encoding(head, assume_text)
+    if encoding is None:
+        return 'hex', format_hex_dump(head[:HEX_PREVIEW_BYTES])
+    text = head.decode(encoding, errors='replace')
+    if len(text) > TEXT_PREVIEW_CHARS or size > head_bytes:
+        text = text[:TEXT_PREVIEW_CHARS] + '...'
+    if tail:
+        tail_encoding, unit = encoding, 1
+        for bom, codec, codec_unit in _TEXT_BOM_TAIL_CODECS:
+            if head.startswith(bom):
+                tail_encoding, unit = codec, codec_unit
+                break
+        tail = tail[-tail_start % unit:]  # Start on a code-unit boundary
+        tail_text = tail.decode(tail_encoding, errors='replace')
+        text += '\n\n[... end of file ...]\n' + tail_text[-TEXT_PREVIEW_CHARS // 2:]
+    return 'text', text
+
+class PreviewResult:
+    """Output of a preview renderer.
+
+    ``kind`` is 'image' (``content`` is a PIL image and ``size`` the full
+    resolution to fit without upscaling), 'text' or 'mono' (``content`` is a
+    string shown proportional or monospaced) or 'message' (a short notice).
+    ``details`` holds extra rows for the details pane.
+    """
+    __slots__ = ('kind', 'content', 'size', 'details')
+
+    def __init__(self, kind, content, size=None, details=None):
+        self.kind = kind
+        self.content = content
+        self.size = size
+        self.details = details or {}
+
+    @property
+    def nbytes(self):
+        if self.kind == 'image':
+            return image_nbytes(self.content)
+        return len(self.content) * 2 + 64
+
+@functools.lru_cache(maxsize=None)
+def _optional_module(name):
+    """Import an optional dependency, or return None if it is not installed."""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        return None
+
+def render_image(path, max_size, quick=False):
+    img, original_size = load_preview_source(path, max_size, quick=quick)
+    width, height = original_size
+    return PreviewResult('image', img, original_size, {
+        'Resolution': f"{width} x {height}",
+        'Megapixels': f"{width * height / 1_000_000:.2f} MP"})
+
+def render_text(path, max_size):
+    extension = os.path.splitext(path)[1].lower()
+    tail_bytes = TEXT_PREVIEW_TAIL_BYTES if extension in TEXT_PREVIEW_TAIL_EXTENSIONS else 0
+    kind, content = read_text_preview(path, tail_bytes=tail_bytes,
+                                      assume_text=extension in PREVIEW_TEXT_EXTENSIONS)
+    return PreviewResult('mono' if kind == 'hex' else 'text', content)
+
+def sniff_csv_dialect(sample, default=csv.excel):
+    """Guess the CSV dialect (delimiter, quoting) of a text sample."""
+    lines = sample.splitlines()
+    if len(lines) > 1:
+        lines.pop()  # Probably cut off mid-row
+    try:
+        return csv.Sniffer().sniff('\n'.join(lines[:50]), delimiters=',;\t|')
+    except csv.Error:
+        return default
+
+def render_csv_head(path, max_size):
+    """First rows of a delimited file, aligned into columns."""
+    with open(path, 'rb') as f:
+        sample = f.read(TEXT_PREVIEW_HEAD_BYTES)
+    encoding = sniff_text_encoding(sample, assume_text=True)
+    if encoding is None:
+        return None
+    text = sample.decode(encoding, errors='replace')
+    lines = text.splitlines()
+    if len(sample) == TEXT_PREVIEW_HEAD_BYTES and len(lines) > 1:
+        lines.pop()  # Partial last line
+    dialect = sniff_csv_dialect(text, csv.excel_tab if path.lower().endswith('.tsv') else csv.excel)
+    rows = list(itertools.islice(csv.reader(lines, dialect), CSV_PREVIEW_ROWS))
+    if not rows:
+        return PreviewResult('text', '')
+    columns = max(len(row) for row in rows)
+    widths = [min(CSV_PREVIEW_COLUMN_WIDTH, max((len(row[i]) for row in rows if i < len(row)), default=0))
+              for i in range(columns)]
+    table = '\n'.join(' | '.join(cell[:widths[i]].ljust(widths[i]) for i, cell in enumerate(row)).rstrip()
+                      for row in rows)
+    return PreviewResult('mono', table, details={'Columns': columns})
+
+def render_archive_listing(path, max_size):
+    """Member listing of a zip or tar archive (None for other formats)."""
+    lines = []
+    if zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            members = archive.infolist()
+            for info in members[:ARCHIVE_PREVIEW_ENTRIES]:
+                lines.append(f"{info.file_size:>14,}  {info.filename}")
+            entries = f"{len(members):,}"
+            truncated = len(members) > ARCHIVE_PREVIEW_ENTRIES
+    elif tarfile.is_tarfile(path):
+        truncated = False
+        with tarfile.open(path) as archive:
+            for member in archive:  # Streams compressed tars, so stop at the listing limit
+                if len(lines) >= ARCHIVE_PREVIEW_ENTRIES:
+                    truncated = True
+                    break
+                lines.append(f"{member.size:>14,}  {member.name}")
+        entries = f"{len(lines):,}" + ("+" if truncated else "")
+    else:
+        return None
+    if truncated:
+        lines.append("...")
+    return PreviewResult('mono', '\n'.join(lines), details={'Entries': entries})
+
+def render_pdf_page(path, max_size):
+    """First page of a PDF via PyMuPDF or pypdfium2, whichever is installed."""
+    fitz = _optional_module('fitz')
+    if fitz is not None:
+        with fitz.open(path) as doc:
+            page = doc.load_page(0)
+            zoom = min(max_size / page.rect.width, max_size / page.rect.height)
+            pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+            img = Image.frombytes('RGB', (pix.width, pix.height), pix.samples)
+            return PreviewResult('image', img, img.size, {'Pages': doc.page_count})
+    pdfium = _optional_module('pypdfium2')
+    if pdfium is not None:
+        pdf = pdfium.PdfDocument(path)
+        try:
+            page = pdf[0]
+            width, height = page.get_size()
+            img = page.render(scale=min(max_size / width, max_size / height)).to_pil()
+            return PreviewResult('image', img, img.size, {'Pages': len(pdf)})
+        finally:
+            pdf.close()
+    return PreviewResult('message', "No preview available\n(install PyMuPDF or pypdfium2 for PDF previews)")
+
+def render_video_frame(path, max_size):
+    """A frame from early in a video via OpenCV, if installed."""
+    cv2 = _optional_module('cv2')
+    if cv2 is None:
+        return PreviewResult('message', "No preview available\n(install opencv-python for video previews)")
+    capture = cv2.VideoCapture(path)
+    try:
+        if not capture.isOpened():
+            raise OSError("Cannot open video")
+        frame_count = capture.get(cv2.CAP_PROP_FRAME_COUNT)
+        fps = capture.get(cv2.CAP_PROP_FPS)
+        if frame_count > 10:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, int(frame_count * 0.1))  # Skip black intros
+        ok, frame = capture.read()
+        if not ok:
+            raise OSError("Cannot decode a video frame")
+    finally:
+        capture.release()
+    img = Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    original_size = img.size
+    img = img.resize(fit_size(original_size, max_size), Image.LANCZOS)
+    details = {'Resolution': f"{original_size[0]} x {original_size[1]}"}
+    if fps > 0 and frame_count > 0:
+        details['Duration'] = f"{frame_count / fps:.1f} s"
+    return PreviewResult('image', img, original_size, details)
+
+class PreviewRegistry:
+    """Maps file extensions and MIME types to preview renderers.
+
+    A renderer is called as ``renderer(path, max_size)`` on a prefetch worker
+    and returns a PreviewResult, or None to defer to the fallback renderer.
+    MIME types may be exact ('application/pdf') or a family ('video/*').
+    """
+    def __init__(self, fallback=None):
+        self.fallback = fallback
+        self._by_extension = {}
+        self._by_mime = {}
+
+    def register(self, renderer, extensions=(), mime_types=()):
+        for extension in extensions:
+            self._by_extension[extension.lower()] = renderer
+        for mime_type in mime_types:
+            self._by_mime[mime_type] = renderer
+
+    def find(self, extension):
+        """Renderer for an extension (e.g. '.jpg'), or None."""
+        renderer = self._by_extension.get(extension)
+        if renderer is None and extension:
+            mime_type, _ = mimetypes.guess_type('preview' + extension)
+            if mime_type:
+                renderer = self._by_mime.get(mime_type) or self._by_mime.get(mime_type.split('/')[0] + '/*')
+        return renderer
+
+    def render(self, path, max_size):
+        renderer = self.find(os.path.splitext(path)[1].lower())
+        result = renderer(path, max_size) if renderer is not None else None
+        if result is None and self.fallback is not None and renderer is not self.fallback:
+            result = self.fallback(path, max_size)
+        return result
+
+def create_default_preview_registry():
+    """Registry with the built-in renderers; unknown files are sniffed as text or hex."""
+    registry = PreviewRegistry(fallback=render_text)
+    pil_extensions = [ext for ext, fmt in Image.registered_extensions().items() if fmt in Image.OPEN]
+    registry.register(render_image, list(PREVIEW_IMAGE_EXTENSIONS) + pil_extensions)
+    registry.register(render_text, PREVIEW_TEXT_EXTENSIONS, mime_types=('text/*',))
+    registry.register(render_csv_head, ('.csv', '.tsv'), mime_types=('text/csv',))
+    registry.register(render_pdf_page, ('.pdf',), mime_types=('application/pdf',))
+    registry.register(render_video_frame, PREVIEW_VIDEO_EXTENSIONS, mime_types=('video/*',))
+    registry.register(render_archive_listing, PREVIEW_ARCHIVE_EXTENSIONS,
+                      mime_types=('application/zip', 'application/x-tar'))
+    return registry
+
+class PreviewCache:
+    """Bounded in-memory LRU cache for decoded previews.
+
+    Each value is stored with its approximate size in bytes; the least
+    recently used entries are evicted once ``max_bytes`` is exceeded.
+    Access is locked so prefetch workers can fill it; evicted values are
+    released after the lock is dropped. Only hold PIL images and bytes in
+    a cache shared with workers: Tk objects must die on the Tk thread.
+    """
+    def __init__(self, max_bytes=PREVIEW_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (value, nbytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def put(self, key, value, nbytes):
+        evicted = []
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+                evicted.append(old)
+            if nbytes > self.max_bytes:
+                return
+            self._entries[key] = (value, nbytes)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                _, entry = self._entries.popitem(last=False)
+                self._bytes -= entry[1]
+                evicted.append(entry)
+        del evicted  # Values are freed here, outside the lock
+
+    def clear(self):
+        with self._lock:
+            entries, self._entries = self._entries, OrderedDict()
+            self._bytes = 0
+        del entries
+
+def user_cache_dir():
+    """Per-user cache directory for SortAnything."""
+    if sys.platform == 'win32':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser('~\\AppData\\Local')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser('~/.cache')
+    return os.path.join(base, 'SortAnything')
+
+def user_data_dir():
+    """Per-user data directory for SortAnything (autosaves)."""
+    if sys.platform == 'win32':
+        base = os.environ.get('APPDATA') or os.path.expanduser('~\\AppData\\Roaming')
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser('~/Library/Application Support')
+    else:
+        base = os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share')
+    return os.path.join(base, 'SortAnything')
+
+def _process_alive(pid):
+    if sys.platform == 'win32':
+        import ctypes
+        handle = ctypes.windll.kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class ThumbnailStore:
+    """Thumbnails kept in a SQLite file so previews survive across sessions.
+
+    Entries are keyed by path and only returned while the file's size and
+    mtime still match. Thumbnails are stored as JPEG (PNG when they have
+    transparency); once the total exceeds ``max_bytes`` the least recently
+    used entries are evicted. The store is a best-effort cache: database
+    errors are swallowed and behave like a miss. Safe to use from workers.
+    """
+    def __init__(self, path=None, max_bytes=THUMBNAIL_CACHE_BYTES):
+        if path is None:
+            path = os.path.join(user_cache_dir(), 'thumbnails.sqlite3')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""CREATE TABLE IF NOT EXISTS thumbnails (
+            path TEXT PRIMARY KEY, file_size INTEGER, mtime REAL,
+            width INTEGER, height INTEGER, details TEXT, data BLOB,
+            nbytes INTEGER, accessed REAL)""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS thumbnails_accessed ON thumbnails (accessed)")
+        self._bytes = self._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM thumbnails").fetchone()[0]
+
+    @staticmethod
+    def _version(path):
+        st = os.stat(path)
+        return st.st_size, st.st_mtime
+
+    def contains(self, path):
+        try:
+            file_size, mtime = self._version(path)
+            with self._lock:
+                row = self._conn.execute("SELECT 1 FROM thumbnails WHERE path=? AND file_size=? AND mtime=?",
+                                         (path, file_size, mtime)).fetchone()
+        except (OSError, sqlite3.Error):
+            return False
+        return row is not None
+
+    def get(self, path):
+        """Return a PreviewResult for an up-to-date thumbnail, or None."""
+        try:
+            file_size, mtime = self._version(path)
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT width, height, details, data FROM thumbnails WHERE path=? AND file_size=? AND mtime=?",
+                    (path, file_size, mtime)).fetchone()
+                if row is None:
+                    return None
+                self._conn.execute("UPDATE thumbnails SET accessed=? WHERE path=?", (time.time(), path))
+            width, height, details, data = row
+            img = Image.open(io.BytesIO(data))
+            img.load()
+        except (OSError, sqlite3.Error, ValueError):
+            return None
+        return PreviewResult('image', img, (width, height), json.loads(details))
+
+    def put(self, path, result):
+        """Store a thumbnail of an image PreviewResult for ``path``."""
+        try:
+            file_size, mtime = self._version(path)
+            img = result.content
+            if max(img.size) > THUMBNAIL_MAX_SIZE:
+                img = img.resize(fit_size(img.size, THUMBNAIL_MAX_SIZE), Image.BILINEAR)
+            buffer = io.BytesIO()
+            if img.mode in ('RGBA', 'LA') or (img.mode == 'P' and 'transparency' in img.info):
+                img.save(buffer, 'PNG')
+            else:
+                img.convert('RGB').save(buffer, 'JPEG', quality=THUMBNAIL_QUALITY)
+            data = buffer.getvalue()
+            if len(data) > self.max_bytes * THUMBNAIL_EVICT_RATIO:
+                return  # Would be evicted straight away; not worth the write
+            with self._lock:
+                old = self._conn.execute("SELECT nbytes FROM thumbnails WHERE path=?", (path,)).fetchone()
+                self._conn.execute("INSERT OR REPLACE INTO thumbnails VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                   (path, file_size, mtime, result.size[0], result.size[1],
+                                    json.dumps(result.details), data, len(data), time.time()))
+                self._bytes += len(data) - (old[0] if old else 0)
+                if self._bytes > self.max_bytes:
+                    self._evict(keep=path)
+        except (OSError, sqlite3.Error, ValueError):
+            pass
+
+    def _evict(self, keep=None):
+        """Drop least recently used thumbnails until under the eviction target, sparing ``keep``."""
+        target = self.max_bytes * THUMBNAIL_EVICT_RATIO
+        freed = 0
+        doomed = []
+        for path, nbytes in self._conn.execute("SELECT path, nbytes FROM thumbnails ORDER BY accessed"):
+            if self._bytes - freed <= target:
+                break
+            if path == keep:
+                continue
+            doomed.append((path,))
+            freed += nbytes
+        self._conn.executemany("DELETE FROM thumbnails WHERE path=?", doomed)
+        self._bytes -= freed
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class SessionJournal:
+    """Crash-safe autosave: a session snapshot plus an append-only event journal.
+
+    record() queues one compact JSON line per sorting event and returns at
+    once; a background writer appends, flushes and fsyncs them. compact()
+    hands over a full session state, which the writer saves next to the
+    journal (via a temp file and rename) before emptying the journal, so
+    the snapshot plus the journal always describe the latest state. Files
+    are named after the process so concurrent instances do not collide;
+    those left behind by a process that is gone are offered for recovery.
+    """
+    _sessions = itertools.count(1)
+
+    def __init__(self, directory=None):
+        directory = directory or os.path.join(user_data_dir(), 'autosave')
+        os.makedirs(directory, exist_ok=True)
+        stem = os.path.join(directory, f"session-{os.getpid()}-{next(self._sessions)}")
+        self.snapshot_path = stem + '.json'
+        self.journal_path = stem + '.journal'
+        self.has_snapshot = False
+        self.records_since_compaction = 0
+        self.error = None
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='journal', daemon=True)
+        self._thread.start()
+
+    def record(self, op, **fields):
+        self._queue.put(('record', {'op': op, **fields}))
+        self.records_since_compaction += 1
+
+    def compact(self, state):
+        self._queue.put(('snapshot', state))
+        self.has_snapshot = True
+        self.records_since_compaction = 0
+
+    def close(self, discard=True):
+        """Stop the writer; ``discard`` removes the autosave (clean shutdown)."""
+        self._queue.put(('close', discard))
+        self._thread.join(timeout=5)
+
+    def _run(self):
+        journal = None
+        while True:
+            messages = [self._queue.get()]
+            try:
+                while True:
+                    messages.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            try:
+                for kind, payload in messages:
+                    if kind == 'record':
+                        if journal is None:
+                            journal = open(self.journal_path, 'a', encoding='utf-8')
+                        journal.write(json.dumps(payload, separators=(',', ':')) + '\n')
+                    elif kind == 'snapshot':
+                        if journal is not None:
+                            journal.close()
+                        temp_path = self.snapshot_path + '.tmp'
+                        with open(temp_path, 'w', encoding='utf-8') as f:
+                            json.dump(payload, f, separators=(',', ':'))
+                            f.flush()
+                            os.fsync(f.fileno())
+                        os.replace(temp_path, self.snapshot_path)
+                        journal = open(self.journal_path, 'w', encoding='utf-8')
+                    elif kind == 'close':
+                        if journal is not None:
+                            journal.close()
+                        if payload:
+                            for path in (self.snapshot_path, self.journal_path):
+                                if os.path.exists(path):
+                                    os.remove(path)
+                        return
+                if journal is not None:
+                    journal.flush()
+                    os.fsync(journal.fileno())
+            except OSError as e:
+                self.error = e  # Autosave is best effort; keep the app running
+
+    @staticmethod
+    def leftovers(directory=None):
+        """Snapshot paths left by processes that are no longer running, newest first."""
+        directory = directory or os.path.join(user_data_dir(), 'autosave')
+        found = []
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return []
+        for name in names:
+            match = re.match(r'^session-(\d+)-\d+\.json$', name)
+            if match and int(match.group(1)) != os.getpid() and not _process_alive(int(match.group(1))):
+                path = os.path.join(directory, name)
+                found.append((os.path.getmtime(path), path))
+        return [path for _, path in sorted(found, reverse=True)]
+
+    @staticmethod
+    def read(snapshot_path):
+        """Return (state, records) of an autosave; a torn last journal line is ignored."""
+        with open(snapshot_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        records = []
+        journal_path = snapshot_path[:-len('.json')] + '.journal'
+        if os.path.exists(journal_path):
+            with open(journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:
+                        break  # Write interrupted by the crash
+        return state, records
+
+    @staticmethod
+    def discard(snapshot_path):
+        for path in (snapshot_path, snapshot_path[:-len('.json')] + '.journal'):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+class SessionDatabase:
+    """Saved sessions in a SQLite file that can be read back a chunk at a time.
+
+    Settings are stored as JSON values in ``meta``; items live in ``items``
+    in session order. Folder prefixes are interned in ``folders`` and
+    attributes whose keys match the session's columns are stored as a JSON
+    array of values, so the repeated strings of a JSON session are written
+    once. read_state() only touches ``meta``; records() yields the JSON
+    session's file records lazily, so loading can start (and resume) before
+    the whole item set has been read.
+    """
+    MAGIC = b"SQLite format 3\x00"
+
+    @staticmethod
+    def is_database(path):
+        try:
+            with open(path, 'rb') as f:
+                return f.read(len(SessionDatabase.MAGIC)) == SessionDatabase.MAGIC
+        except OSError:
+            return False
+
+    @staticmethod
+    def write(path, state, records):
+        """Write ``state`` (a session dict without "files") and the file records."""
+        columns = state.get("csv_headers") or []
+        temp_path = path + '.tmp'
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        conn = sqlite3.connect(temp_path)
+        try:
+            conn.execute("PRAGMA journal_mode=OFF")
+            conn.execute("PRAGMA synchronous=OFF")
+            conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            conn.execute("CREATE TABLE folders (id INTEGER PRIMARY KEY, path TEXT NOT NULL UNIQUE)")
+            conn.execute("""CREATE TABLE items (
+                pos INTEGER PRIMARY KEY, folder INTEGER NOT NULL, name TEXT NOT NULL,
+                selected INTEGER, skipped INTEGER, bucket INTEGER, attributes TEXT)""")
+            folders = {}
+
+            def rows():
+                for pos, file_data in enumerate(records):
+                    path = file_data["path"]
+                    name = os.path.split(path)[1]  # Knows both separators on Windows
+                    folder = path[:len(path) - len(name)]  # Exact prefix, so folder + name == path
+                    folder_id = folders.setdefault(folder, len(folders))
+                    attributes = file_data.get("attributes")
+                    if attributes:
+                        if list(attributes) == columns:
+                            attributes = list(attributes.values())
+                        attributes = json.dumps(attributes, separators=(',', ':'))
+                    else:
+                        attributes = None
+                    yield (pos, folder_id, name, int(file_data.get("selected", False)),
+                           int(file_data.get("skipped", False)), file_data.get("bucket_number"), attributes)
+
+            conn.executemany("INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?)", rows())
+            conn.executemany("INSERT INTO folders VALUES (?, ?)", ((i, p) for p, i in folders.items()))
+            conn.executemany("INSERT INTO meta VALUES (?, ?)",
+                             [(key, json.dumps(value)) for key, value in state.items() if key != "files"])
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(temp_path, path)
+
+    @staticmethod
+    def _connect_readonly(path):
+        return sqlite3.connect(Path(os.path.abspath(path)).as_uri() + "?mode=ro", uri=True)
+
+    @staticmethod
+    def read_state(path):
+        """Return (state, item count) without reading the items."""
+        conn = SessionDatabase._connect_readonly(path)
+        try:
+            state = {key: json.loads(value) for key, value in conn.execute("SELECT key, value FROM meta")}
+            count = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+        finally:
+            conn.close()
+        return state, count
+
+    @staticmethod
+    def records(path, batch_size=SESSION_LOAD_CHUNK):
+        """Yield the session's file records in order, fetching ``batch_size`` rows at a time.
+
+        The connection is opened on first use, so the generator may be
+        handed to (and consumed by) a worker thread.
+        """
+        conn = SessionDatabase._connect_readonly(path)
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'csv_headers'").fetchone()
+            columns = (json.loads(row[0]) if row else None) or []
+            folders = dict(conn.execute("SELECT id, path FROM folders"))
+            cursor = conn.execute("""SELECT folder, name, selected, skipped, bucket, attributes
+                                     FROM items ORDER BY pos""")
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for folder, name, selected, skipped, bucket, attributes in rows:
+                    file_data = {"path": folders[folder] + name, "selected": bool(selected),
+                                 "bucket_number": bucket, "skipped": bool(skipped)}
+                    if attributes is not None:
+                        attributes = json.loads(attributes)
+                        if isinstance(attributes, list):
+                            attributes = dict(zip(columns, attributes))
+                        file_data["attributes"] = attributes
+                    yield file_data
+        finally:
+            conn.close()
+
+class PreviewPrefetcher:
+    """Decodes previews for nearby items in a worker pool.
+
+    Finished previews go straight into the shared PreviewCache, so the Tk
+    thread only has to wrap them in a PhotoImage. Each prefetch() call
+    replaces the wanted set: queued work for items the user jumped away from
+    is cancelled, and workers skip anything no longer wanted.
+    """
+    def __init__(self, cache, load, load_quick=None, workers=PREFETCH_WORKERS):
+        self.cache = cache
+        self.load = load  # path -> (value, nbytes), called on a worker thread
+        self.load_quick = load_quick  # optional cheap first pass; may return None
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='preview')
+        self._pending = {}  # key -> Future
+        self._wanted = set()
+        self._lock = threading.Lock()
+
+    def request(self, key, path, quick_key=None):
+        """Return a Future for one preview, submitting it if not already queued.
+
+        With ``quick_key`` a quick render is cached under that key before the
+        full decode starts, so the UI can show something immediately.
+        """
+        with self._lock:
+            self._wanted.add(key)
+            future = self._pending.get(key)
+            if future is None or future.cancelled():
+                future = self._executor.submit(self._work, key, path, quick_key)
+                self._pending[key] = future
+                future.add_done_callback(lambda f, k=key: self._forget(k, f))
+            return future
+
+    def prefetch(self, requests):
+        """Make ``requests`` ((key, path) pairs, most urgent first) the wanted set."""
+        with self._lock:
+            self._wanted = {key for key, _ in requests}
+            for key, future in list(self._pending.items()):
+                if key not in self._wanted and future.cancel():
+                    del self._pending[key]
+        for key, path in requests:
+            if key not in self.cache:
+                self.request(key, path)
+
+    def _forget(self, key, future):
+        with self._lock:
+            if self._pending.get(key) is future:
+                del self._pending[key]
+
+    def _work(self, key, path, quick_key=None):
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        with self._lock:
+            if key not in self._wanted:
+                return None  # Stale: the user moved on before this started
+        if quick_key is not None and self.load_quick is not None and quick_key not in self.cache:
+            quick = self.load_quick(path)  # None when the file has no quick render
+            if quick is not None:
+                self.cache.put(quick_key, *quick)
+        value, nbytes = self.load(path)
+        self.cache.put(key, value, nbytes)
+        return value
+
+    def shutdown(self):
+        with self._lock:
+            self._wanted = set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+class BackgroundJob:
+    """Runs work off the Tk thread and reports back through a queue.
+
+    Messages are ``(kind, payload)`` tuples; the UI drains them with
+    ``root.after`` polling. A ``('done', None)`` message is always last.
+    """
+    activity = "working"  # Shown in status text, e.g. "(scanning... 1,200 found)"
+
+    def __init__(self):
+        self.queue = queue.Queue()
+        self._cancel_event = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def _run(self):
+        try:
+            self.run()
+        except Exception as e:
+            self.queue.put(('error', str(e)))
+        finally:
+            self.queue.put(('done', None))
+
+    def run(self):
+        raise NotImplementedError
+
+def compile_globs(patterns):
+    """Compile ';'-style glob patterns into (name_regex, path_regex).
+
+    Patterns containing '/' match the path relative to the scanned folder,
+    the others match the entry name. Matching is case-insensitive; either
+    regex is None when there are no patterns of that kind.
+    """
+    name_globs = [p for p in patterns if '/' not in p]
+    path_globs = [p.strip('/') for p in patterns if '/' in p]
+    compile_ = lambda globs: re.compile('|'.join(fnmatch.translate(g) for g in globs), re.IGNORECASE) \
+        if globs else None
+    return compile_(name_globs), compile_(path_globs)
+
+def _glob_match(globs, name, rel_path):
+    name_re, path_re = globs
+    return bool((name_re and name_re.match(name)) or (path_re and path_re.match(rel_path)))
+
+class ScanFolder:
+    """One listed folder in a ScanSnapshot."""
+    __slots__ = ('mtime', 'entries', 'subdirs')
+
+    def __init__(self, mtime):
+        self.mtime = mtime
+        self.entries = {}  # listed path -> identity key (None when not deduplicating)
+        self.subdirs = []  # (path, rel_path, depth) of folders to descend into
+
+class ScanSnapshot:
+    """What a finished DirectoryScanner saw, so the next scan can be incremental."""
+    __slots__ = ('options', 'started', 'folders')
+
+    def __init__(self, options, started, folders):
+        self.options = options
+        self.started = started
+        self.folders = folders  # folder path -> ScanFolder
+
+class DirectoryScanner(BackgroundJob):
+    """Lists directories with os.scandir and streams FileItems in batches.
+
+    A plain scan lists the direct children of each directory. A
+    ``recursive`` scan lists files only, descending at most ``max_depth``
+    levels (None for no limit), and walks each top-level subtree on a pool
+    worker. ``exclude`` globs prune files and whole folders while walking;
+    ``include`` globs restrict which files are listed. Hidden entries are
+    skipped, and folders or files reachable through several paths (symlinks,
+    hard links) are visited once.
+
+    Given the ``previous`` snapshot of a scan with the same options, only
+    folders whose mtime changed are listed again: each is reported whole as
+    a ``('folder', (path, items))`` message, and paths that disappeared are
+    sent as one ``('removed', paths)`` message at the end. ``snapshot`` is
+    set once a scan completes.
+    """
+    activity = "scanning"
+
+    def __init__(self, directories, batch_size=SCAN_BATCH_SIZE, recursive=False, max_depth=None,
+                 include=(), exclude=(), workers=SCAN_WORKERS, previous=None):
+        super().__init__()
+        self.directories = list(directories)
+        self.batch_size = batch_size
+        self.recursive = recursive
+        self.max_depth = max_depth
+        self.include = compile_globs(include) if include else None
+        self.exclude = compile_globs(exclude) if exclude else None
+        self.workers = workers
+        self.options = (recursive, max_depth, tuple(include), tuple(exclude))
+        self.previous = previous if previous is not None and previous.options == self.options else None
+        self.snapshot = None
+        self._started = time.time()
+        self._folders = {}
+        self._lock = threading.Lock()
+        self._seen = set()
+        self._scanned = 0
+        self._subtrees_done = 0
+        self._subtrees_total = 0
+        self._denied = []
+
+    def run(self):
+        self._subtrees_total = len(self.directories)
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='scan') as pool:
+            futures = []
+            for directory in self.directories:
+                if self.cancelled:
+                    return
+                subdirs = []
+                try:
+                    self._list_directory(directory, '', 0, subdirs)
+                except PermissionError:
+                    self.queue.put(('warning', f"Cannot access directory: {directory}"))
+                except (FileNotFoundError, NotADirectoryError):
+                    pass
+                with self._lock:
+                    self._subtrees_total += len(subdirs)
+                futures.extend(pool.submit(self._walk, *subdir) for subdir in subdirs)
+                self._finish_subtree()
+        for future in futures:
+            future.result()  # Re-raise unexpected worker errors
+        if self.cancelled:
+            return
+        if self._denied:
+            self.queue.put(('warning', f"Cannot access {len(self._denied):,} folder(s), e.g. {self._denied[0]}"))
+        if self.previous is not None:
+            removed = []
+            for path, old in self.previous.folders.items():
+                new = self._folders.get(path)
+                if new is not old:
+                    current = new.entries if new is not None else {}
+                    removed.extend(p for p in old.entries if p not in current)
+            if removed:
+                self.queue.put(('removed', removed))
+        self.snapshot = ScanSnapshot(self.options, self._started, self._folders)
+
+    def _walk(self, path, rel_path, depth):
+        """Walk one subtree depth-first on a pool worker."""
+        stack = [(path, rel_path, depth)]
+        while stack:
+            if self.cancelled:
+                return
+            path, rel_path, depth = stack.pop()
+            try:
+                self._list_directory(path, rel_path, depth, stack)
+            except PermissionError:
+                with self._lock:
+                    self._denied.append(path)
+            except (FileNotFoundError, NotADirectoryError):
+                pass
+        self._finish_subtree()
+
+    def _list_directory(self, path, rel_path, depth, subdirs):
+        """Emit the listed entries of one folder; queue folders to descend into on ``subdirs``."""
+        st = os.stat(path)
+        if self.recursive and not self._claim(self._identity(path, st)):
+            return  # Already walked through another path
+        old = self.previous.folders.get(path) if self.previous is not None else None
+        if old is not None and old.mtime == st.st_mtime and st.st_mtime < self.previous.started - SCAN_MTIME_SLACK:
+            # Unchanged since the previous scan: its entries and subfolders are still valid
+            with self._lock:
+                self._folders[path] = old
+                self._seen.update(key for key in old.entries.values() if key is not None)
+            subdirs.extend(old.subdirs)
+            return
+
+        folder = ScanFolder(st.st_mtime)
+        incremental = self.previous is not None
+        batch = []
+        listed = []
+        descend = self.recursive and (self.max_depth is None or depth < self.max_depth)
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if self.cancelled:
+                    return
+                name = entry.name
+                if name.startswith('.'):
+                    continue
+                entry_rel = f"{rel_path}/{name}" if rel_path else name
+                if self.exclude and _glob_match(self.exclude, name, entry_rel):
+                    continue
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir and self.recursive:
+                    if descend:
+                        folder.subdirs.append((entry.path, entry_rel, depth + 1))
+                    continue
+                if not is_dir and self.include and not _glob_match(self.include, name, entry_rel):
+                    continue
+                key = None
+                if self.recursive:
+                    try:
+                        key = self._identity(entry.path, entry.stat(), entry)
+                    except OSError:
+                        key = os.path.normcase(entry.path)
+                    if not self._claim(key):
+                        continue
+                folder.entries[entry.path] = key
+                item = FileItem.from_dir_entry(entry)
+                if incremental:
+                    listed.append(item)
+                    continue
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    self._emit(batch)
+                    batch = []
+        if batch:
+            self._emit(batch)
+        subdirs.extend(folder.subdirs)
+        with self._lock:
+            self._folders[path] = folder
+            if incremental:
+                self._scanned += len(listed)
+                self.queue.put(('folder', (path, listed)))
+
+    @staticmethod
+    def _identity(path, st, entry=None):
+        """Key identifying a folder or file regardless of the path used to reach it."""
+        if st.st_ino:
+            return (st.st_dev, st.st_ino)
+        if entry is None or entry.is_symlink():
+            return os.path.normcase(os.path.realpath(path))  # No inode numbers (Windows scandir)
+        return os.path.normcase(path)
+
+    def _claim(self, key):
+        """True the first time ``key`` is seen in this scan."""
+        with self._lock:
+            if key in self._seen:
+                return False
+            self._seen.add(key)
+            return True
+
+    def _emit(self, batch):
+        with self._lock:
+            self._scanned += len(batch)
+            self.queue.put(('batch', batch))
+            self.queue.put(('progress', (self._subtrees_done, self._subtrees_total, self._scanned)))
+
+    def _finish_subtree(self):
+        with self._lock:
+            self._subtrees_done += 1
+            self.queue.put(('progress', (self._subtrees_done, self._subtrees_total, self._scanned)))
+
+class FolderWatcher:
+    """Notices files being added, removed or renamed below a set of folders.
+
+    Uses watchdog (inotify, FSEvents, ReadDirectoryChangesW) when it is
+    installed. Otherwise changed() reports True every WATCH_POLL_SECONDS and
+    the caller's incremental rescan does the (cheap) folder mtime checks.
+    changed() is meant to be polled from the Tk thread.
+    """
+    def __init__(self, directories, recursive=False):
+        self.directories = list(directories)
+        self.recursive = recursive
+        self._last_event = None
+        self._next_poll = 0.0
+        self._observer = None
+        observers = _optional_module('watchdog.observers')
+        if observers is not None:
+            observer = observers.Observer()
+            try:
+                for directory in self.directories:
+                    observer.schedule(self, directory, recursive=recursive)
+                observer.daemon = True
+                observer.start()
+                self._observer = observer
+            except Exception:
+                pass  # E.g. out of inotify watches: fall back to polling
+
+    @property
+    def native(self):
+        return self._observer is not None
+
+    def dispatch(self, event):
+        """watchdog callback (observer thread); reads and in-place edits are ignored."""
+        if event.event_type in ('created', 'deleted', 'moved'):
+            self._last_event = time.monotonic()
+
+    def changed(self):
+        """True when a rescan is due; consumes the pending notification."""
+        now = time.monotonic()
+        if self._observer is not None:
+            last = self._last_event
+            if last is not None and now - last >= WATCH_SETTLE_SECONDS:
+                self._last_event = None
+                return True
+            return False
+        if now >= self._next_poll:
+            self._next_poll = now + WATCH_POLL_SECONDS
+            return True
+        return False
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer = None
+
+class ListImporter(BackgroundJob):
+    """Streams list items from a text or CSV file in batches.
+
+    The file is read incrementally, so multi-GB inputs are never held in
+    memory. The encoding is sniffed from the first block. With ``delimited``
+    the CSV dialect is sniffed too and the first row gives the headers, sent
+    as a ``('columns', headers)`` message before any batch; otherwise every
+    non-blank line is one item. Progress is reported in bytes read.
+    """
+    activity = "importing"
+
+    def __init__(self, path, delimited=False, batch_size=SCAN_BATCH_SIZE):
+        super().__init__()
+        self.path = path
+        self.delimited = delimited
+        self.batch_size = batch_size
+
+    def run(self):
+        total = os.path.getsize(self.path)
+        with open(self.path, 'rb') as raw:
+            sample = raw.read(IMPORT_SNIFF_BYTES)
+            raw.seek(0)
+            encoding = sniff_text_encoding(sample, assume_text=True) or 'utf-8'
+            text = io.TextIOWrapper(raw, encoding=encoding, errors='replace',
+                                    newline='' if self.delimited else None)
+            if self.delimited:
+                dialect = sniff_csv_dialect(sample.decode(encoding, errors='replace'))
+                rows = csv.reader(text, dialect)
+                headers = [h.strip() for h in next(rows, [])]
+                if not headers:
+                    raise ValueError("The file is empty")
+                self.queue.put(('columns', headers))
+                make_item = lambda row: self._csv_item(row, headers)
+            else:
+                rows = text
+                make_item = self._line_item
+            count = 0
+            batch = []
+            for row in rows:
+                if self.cancelled:
+                    return
+                item = make_item(row)
+                if item is None:
+                    continue
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    count += len(batch)
+                    self.queue.put(('batch', batch))
+                    self.queue.put(('progress', (raw.tell(), total, count)))
+                    batch = []
+            if batch:
+                count += len(batch)
+                self.queue.put(('batch', batch))
+            self.queue.put(('progress', (total, total, count)))
+
+    @staticmethod
+    def _line_item(line):
+        line = line.strip()
+        return FileItem(line, populate=False) if line else None
+
+    @staticmethod
+    def _csv_item(row, headers):
+        if not row:
+            return None
+        item = FileItem(row[0].strip(), populate=False)
+        item.attributes = {header: (row[i].strip() if i < len(row) else "")
+                           for i, header in enumerate(headers) if header}
+        return item
+
+class MetadataResolver(BackgroundJob):
+    """Stats items created without metadata (e.g. imported lines that are paths)."""
+    activity = "resolving"
+
+    def __init__(self, items, batch_size=SCAN_BATCH_SIZE):
+        super().__init__()
+        self.items = list(items)
+        self.batch_size = batch_size
+
+    def run(self):
+        total = len(self.items)
+        for start in range(0, total, self.batch_size):
+            if self.cancelled:
+                return
+            for item in self.items[start:start + self.batch_size]:
+                item.refresh_metadata()
+            self.queue.put(('progress', (min(start + self.batch_size, total), total)))
+
+class SessionLoader(BackgroundJob):
+    """Rebuilds the items of a saved session, checking the files in a thread pool.
+
+    ``records`` may be any iterable of session file records (a JSON list or
+    SessionDatabase.records()); it is consumed a chunk at a time. Items are
+    emitted in session order with their ``bucket`` already set, and the Tk
+    thread adds them to the bucket as it appends them. With ``check_paths``
+    each path is statted (on SESSION_LOAD_WORKERS threads) to refresh its
+    metadata, and files that no longer exist are left out. A ``ready``
+    message is sent once more than ``ready_at`` items have been loaded, so
+    sorting can resume before the rest of a large session has arrived.
+    """
+    activity = "loading"
+
+    def __init__(self, records, total, buckets_by_number, check_paths=True, ready_at=None):
+        super().__init__()
+        self.records = records
+        self.total = total
+        self.buckets_by_number = buckets_by_number
+        self.check_paths = check_paths
+        self.ready_at = ready_at
+
+    def run(self):
+        records = iter(self.records)
+        try:
+            self._load(records)
+        finally:
+            # Close a SessionDatabase.records() generator here: its connection
+            # belongs to this thread and must not be closed by the GC elsewhere
+            close = getattr(records, 'close', None)
+            if close is not None:
+                close()
+
+    def _load(self, records):
+        chunks = iter(lambda: list(itertools.islice(records, SESSION_LOAD_CHUNK)), [])
+        pending = deque()  # Bounded, so a database session is never read all at once
+        done = loaded = 0
+        ready = self.ready_at is None
+        with ThreadPoolExecutor(max_workers=SESSION_LOAD_WORKERS, thread_name_prefix='session') as pool:
+            for chunk in itertools.chain(chunks, [None] * SESSION_LOAD_WORKERS * 2):
+                if chunk is not None:
+                    pending.append((len(chunk), pool.submit(self._build, chunk)))
+                if (chunk is not None and len(pending) < SESSION_LOAD_WORKERS * 2) or not pending:
+                    continue
+                size, future = pending.popleft()
+                batch = future.result()
+                if self.cancelled:
+                    for _, future in pending:
+                        future.cancel()
+                    return
+                done += size
+                loaded += len(batch)
+                if batch:
+                    self.queue.put(('batch', batch))
+                self.queue.put(('progress', (done, max(self.total, done), loaded)))
+                if not ready and loaded > self.ready_at + SESSION_LOAD_CHUNK:
+                    ready = True
+                    self.queue.put(('ready', None))
+
+    def _build(self, chunk):
+        """Items for a chunk of file records, leaving out files that are gone."""
+        items = []
+        for file_data in chunk:
+            if self.cancelled:
+                return []
+            path = file_data["path"]
+            item = FileItem(path, populate=False)
+            if self.check_paths:
+                if not item.refresh_metadata():
+                    continue
+                item.name = os.path.basename(os.path.normpath(path)) or path
+            item.bucket = self.buckets_by_number.get(file_data.get("bucket_number"))
+            item.selected = file_data.get("selected", False)
+            item.skipped = file_data.get("skipped", False)
+            if "attributes" in file_data:
+                item.attributes = file_data["attributes"]
+            items.append(item)
+        return items
+
+class ThumbnailWarmup(BackgroundJob):
+    """Fills the ThumbnailStore for images that have no up-to-date thumbnail."""
+    def __init__(self, store, paths):
+        super().__init__()
+        self.store = store
+        self.paths = list(paths)
+
+    def run(self):
+        total = len(self.paths)
+        for index, path in enumerate(self.paths):
+            if self.cancelled:
+                return
+            if not self.store.contains(path):
+                try:
+                    self.store.put(path, render_image(path, THUMBNAIL_MAX_SIZE))
+                except Exception:
+                    pass  # Unreadable or not really an image; the preview will say so
+            self.queue.put(('progress', (index + 1, total)))
+
+def _export_record(item):
+    """An item as exported to JSON."""
+    record = {
+        "name": item.name, "path": str(item.path), "size": item.size,
+        "modified": item.modified.isoformat(), "is_file": item.is_file
+    }
+    if item.attributes:
+        record["attributes"] = dict(item.attributes)
+    return record
+
+def _indented_json(value, indent):
+    return json.dumps(value, indent=2).replace('\n', '\n' + ' ' * indent)
+
+def write_json_export(out, buckets, skipped):
+    """Write the JSON export item by item; yields after each item (see ResultExporter)."""
+    out.write('{\n  "export_date": %s,\n  "buckets": [' % json.dumps(datetime.now().isoformat()))
+    for index, (name, color, items) in enumerate(buckets):
+        out.write('%s\n    {\n      "name": %s,\n      "color": %s,\n      "items": ['
+                  % (',' if index else '', json.dumps(name), json.dumps(color)))
+        for position, item in enumerate(items):
+            out.write('%s\n        %s' % (',' if position else '', _indented_json(_export_record(item), 8)))
+            yield
+        out.write('\n      ]\n    }' if items else ']\n    }')
+    out.write('\n  ],\n  "skipped_items": [' if buckets else '],\n  "skipped_items": [')
+    for position, item in enumerate(skipped):
+        out.write('%s\n    %s' % (',' if position else '', _indented_json(_export_record(item), 4)))
+        yield
+    out.write('\n  ]\n}' if skipped else ']\n}')
+
+def write_csv_export(out, buckets, skipped):
+    """Write the CSV export row by row; yields after each item."""
+    writer = csv.writer(out)
+    writer.writerow(['Category', 'Bucket', 'Item Name', 'Full Path', 'Size', 'Modified', 'Type'])
+    sections = [('Sorted', name, items) for name, _color, items in buckets] + [('Skipped', 'N/A', skipped)]
+    for category, bucket_name, items in sections:
+        for item in items:
+            size_str = f"{item.size:,}" if item.is_file else "N/A"
+            modified_str = item.modified.strftime("%Y-%m-%d %H:%M:%S")
+            type_str = "File" if item.is_file else "Folder"
+            writer.writerow([category, bucket_name, item.name, str(item.path),
+                             size_str, modified_str, type_str])
+            yield
+
+def _write_txt_item(out, item):
+    out.write(f"  {item.name}\n    Path: {item.path}\n")
+    if item.is_file:
+        out.write(f"    Size: {item.size:,} bytes\n")
+    out.write(f"    Modified: {item.modified.strftime('%Y-%m-%d %H:%M:%S')}\n")
+    for key, value in item.attributes.items():
+        out.write(f"    {key}: {value}\n")
+    out.write("\n")
+
+def write_txt_export(out, buckets, skipped):
+    """Write the text report item by item; yields after each item."""
+    out.write("SortAnything Results\n")
+    out.write(f"Export Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    out.write("=" * 50 + "\n\n")
+    for name, _color, items in buckets:
+        if items:
+            out.write(f"BUCKET: {name}\n" + "-" * 30 + "\n")
+            for item in items:
+                _write_txt_item(out, item)
+                yield
+            out.write("\n")
+    if skipped:
+        out.write("SKIPPED ITEMS\n" + "-" * 30 + "\n")
+        for item in skipped:
+            _write_txt_item(out, item)
+            yield
+
+def _write_html_item(out, item, indent):
+    size_str = f"{item.size:,} bytes" if item.is_file else "Folder"
+    attributes = "".join(f"<br>{html.escape(str(key))}: {html.escape(str(value))}"
+                         for key, value in item.attributes.items())
+    out.write(f"""
+{indent}<div class="item">
+{indent}    <div class="item-name">{html.escape(item.name)}</div>
+{indent}    <div class="item-details">
+{indent}        Path: {html.escape(str(item.path))}<br>
+{indent}        Size: {size_str}<br>
+{indent}        Modified: {item.modified.strftime('%Y-%m-%d %H:%M:%S')}
+{attributes}{indent}    </div>
+{indent}</div>
+""")
+
+def write_html_export(out, buckets, skipped):
+    """Write the HTML report item by item; yields after each item."""
+    out.write(f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>SortAnything Results</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 20px; background-color: {DARK_COLORS['bg']}; color: {DARK_COLORS['fg']}; }}
+        .bucket {{ margin-bottom: 30px; border: 1px solid #555; padding: 15px; }}
+        .bucket-header {{ background-color: {DARK_COLORS['entry_bg']}; padding: 10px; margin: -15px -15px 15px -15px; }}
+        .item {{ margin-bottom: 10px; padding: 10px; background-color: {DARK_COLORS['entry_bg']}; }}
+        .item-name {{ font-weight: bold; }}
+        .item-details {{ color: #ccc; font-size: 0.9em; }}
+        .skipped-section {{ margin-top: 30px; }}
+    </style>
+</head>
+<body>
+    <h1>SortAnything Results</h1>
+    <p>Export Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+""")
+    for name, color, items in buckets:
+        if items:
+            out.write(f"""
+    <div class="bucket">
+        <div class="bucket-header" style="background-color: {html.escape(color)};">
+            <h2>{html.escape(name)} ({len(items)} items)</h2>
+        </div>
+""")
+            for item in items:
+                _write_html_item(out, item, "        ")
+                yield
+            out.write("    </div>\n")
+    if skipped:
+        out.write(f"""
+    <div class="skipped-section">
+        <div class="bucket">
+            <div class="bucket-header">
+                <h2>Skipped Items ({len(skipped)} items)</h2>
+            </div>
+""")
+        for item in skipped:
+            _write_html_item(out, item, "            ")
+            yield
+        out.write("        </div>\n    </div>\n")
+    out.write("</body>\n</html>")
+
+PAGED_REPORT_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>SortAnything Results</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 20px; background-color: %(bg)s; color: %(fg)s; }
+        #layout { display: flex; gap: 20px; }
+        #sections { width: 240px; flex: none; }
+        .section { padding: 8px 10px; margin-bottom: 6px; cursor: pointer; border-left: 8px solid #555; background-color: %(entry_bg)s; }
+        .section.active { outline: 1px solid %(fg)s; }
+        #main { flex: 1; min-width: 0; }
+        #toolbar { display: flex; gap: 8px; align-items: center; margin-bottom: 10px; }
+        #toolbar input { flex: 1; padding: 5px; background-color: %(entry_bg)s; color: %(fg)s; border: 1px solid #555; }
+        #toolbar button { padding: 5px 10px; }
+        #viewport { height: 70vh; overflow-y: auto; position: relative; border: 1px solid #555; }
+        .item { position: absolute; left: 0; right: 0; height: %(row)spx; box-sizing: border-box; padding: 4px 10px;
+                border-bottom: 1px solid %(bg)s; background-color: %(entry_bg)s; overflow: hidden; white-space: nowrap; text-overflow: ellipsis; }
+        .item-name { font-weight: bold; overflow: hidden; text-overflow: ellipsis; }
+        .item-details { color: #ccc; font-size: 0.85em; overflow: hidden; text-overflow: ellipsis; }
+    </style>
+</head>
+<body>
+    <h1>SortAnything Results</h1>
+    <p>Export Date: %(date)s</p>
+    <div id="layout">
+        <div id="sections"></div>
+        <div id="main">
+            <div id="toolbar">
+                <input id="search" type="search" placeholder="Search this bucket">
+                <button id="prev">&larr;</button><span id="page"></span><button id="next">&rarr;</button>
+            </div>
+            <div id="viewport"><div id="spacer"></div></div>
+        </div>
+    </div>
+    <script>
+    var REPORT = %(report)s;
+    var ROW = %(row)s, shards = {}, waiting = {}, current = 0, page = 0, rows = [], query = "", searchId = 0;
+    var SortAnythingReport = { shard: function (section, index, data) {
+        var key = section + "-" + index;
+        shards[key] = data;
+        (waiting[key] || []).forEach(function (callback) { callback(data); });
+        delete waiting[key];
+    } };
+    function loadShard(section, index, callback) {
+        var key = section + "-" + index;
+        if (shards[key]) { callback(shards[key]); return; }
+        if (!waiting[key]) {
+            waiting[key] = [];
+            var script = document.createElement("script");
+            script.src = REPORT.data + "/s" + key + ".js";
+            document.head.appendChild(script);
+        }
+        waiting[key].push(callback);
+    }
+    function size(row) { return row[2] === null ? "Folder" : row[2].toLocaleString() + " bytes"; }
+    function text(row) {
+        var parts = ["Path: " + row[1], "Size: " + size(row), "Modified: " + row[3]];
+        for (var key in row[4] || {}) { parts.push(key + ": " + row[4][key]); }
+        return parts.join(" \\u00b7 ");
+    }
+    function render() {
+        var viewport = document.getElementById("viewport"), spacer = document.getElementById("spacer");
+        spacer.style.height = rows.length * ROW + "px";
+        var first = Math.floor(viewport.scrollTop / ROW), last = Math.min(rows.length, first + Math.ceil(viewport.clientHeight / ROW) + 2);
+        var html = [];
+        for (var i = first; i < last; i++) {
+            html.push('<div class="item" style="top:' + i * ROW + 'px"><div class="item-name"></div><div class="item-details"></div></div>');
+        }
+        spacer.innerHTML = html.join("");
+        var nodes = spacer.children;
+        for (var j = 0; j < nodes.length; j++) {
+            nodes[j].children[0].textContent = rows[first + j][0];
+            nodes[j].children[1].textContent = text(rows[first + j]);
+        }
+    }
+    function showRows(data, label) {
+        rows = data;
+        document.getElementById("page").textContent = label;
+        render();
+    }
+    function showPage() {
+        var section = REPORT.sections[current], pages = Math.max(section.shards, 1);
+        page = Math.max(0, Math.min(page, pages - 1));
+        document.getElementById("viewport").scrollTop = 0;
+        if (!section.shards) { showRows([], "No items"); return; }
+        loadShard(current, page, function (data) {
+            if (!query) { showRows(data, " Page " + (page + 1) + " of " + pages + " "); }
+        });
+    }
+    function search() {
+        var id = ++searchId, section = REPORT.sections[current], matches = [], needle = query.toLowerCase();
+        document.getElementById("viewport").scrollTop = 0;
+        (function next(index) {
+            if (id !== searchId) { return; }
+            var label = " " + matches.length.toLocaleString() + " matches";
+            if (index >= section.shards) { showRows(matches, label + " "); return; }
+            showRows(matches, label + " (searching " + (index + 1) + "/" + section.shards + ") ");
+            loadShard(current, index, function (data) {
+                data.forEach(function (row) {
+                    if ((row[0] + "\\n" + text(row)).toLowerCase().indexOf(needle) >= 0) { matches.push(row); }
+                });
+                next(index + 1);
+            });
+        })(0);
+    }
+    function update() {
+        if (query) { search(); } else { searchId++; showPage(); }
+    }
+    function select(index) {
+        current = index;
+        page = 0;
+        var nodes = document.getElementById("sections").children;
+        for (var i = 0; i < nodes.length; i++) { nodes[i].className = i === index ? "section active" : "section"; }
+        update();
+    }
+    REPORT.sections.forEach(function (section, index) {
+        var node = document.createElement("div");
+        node.className = "section";
+        node.style.borderLeftColor = section.color || "#555";
+        node.textContent = section.title + " (" + section.count.toLocaleString() + " items)";
+        node.onclick = function () { select(index); };
+        document.getElementById("sections").appendChild(node);
+    });
+    document.getElementById("viewport").onscroll = render;
+    window.onresize = render;
+    document.getElementById("prev").onclick = function () { if (!query) { page--; showPage(); } };
+    document.getElementById("next").onclick = function () { if (!query) { page++; showPage(); } };
+    document.getElementById("search").oninput = function () { query = this.value.trim(); update(); };
+    if (REPORT.sections.length) { select(0); }
+    </script>
+</body>
+</html>
+"""
+
+def paged_report_data_dir(filename):
+    """Folder holding the data shards of a paged HTML report."""
+    return os.path.splitext(filename)[0] + "_files"
+
+def write_paged_html_export(out, buckets, skipped, data_dir, shard_dir=None):
+    """Write a paged HTML report: a small index page plus per-bucket data shards.
+
+    The page only embeds the bucket list; items go to ``data_dir`` as
+    scripts of REPORT_SHARD_ITEMS rows each, which the page loads on demand
+    (as script tags, so the report also works from file://) and shows
+    with paging, search and a virtually scrolled list. The shards are
+    written to ``shard_dir`` when given (a temporary folder that is moved
+    to ``data_dir`` later). Yields after each item.
+    """
+    sections = [(name, color, items) for name, color, items in buckets if items]
+    if skipped:
+        sections.append(("Skipped Items", None, skipped))
+    shard_dir = shard_dir or data_dir
+    os.makedirs(shard_dir, exist_ok=True)
+    report = {
+        "data": urllib.parse.quote(os.path.basename(data_dir)),
+        "sections": [{"title": name, "color": color, "count": len(items),
+                      "shards": -(-len(items) // REPORT_SHARD_ITEMS)} for name, color, items in sections]
+    }
+    out.write(PAGED_REPORT_TEMPLATE % {
+        "bg": DARK_COLORS['bg'], "fg": DARK_COLORS['fg'], "entry_bg": DARK_COLORS['entry_bg'],
+        "row": REPORT_ROW_HEIGHT, "date": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        "report": json.dumps(report).replace('</', '<\\/')})
+    for section, (_name, _color, items) in enumerate(sections):
+        for shard, start in enumerate(range(0, len(items), REPORT_SHARD_ITEMS)):
+            path = os.path.join(shard_dir, f"s{section}-{shard}.js")
+            with open(path, 'w', encoding='utf-8', buffering=EXPORT_BUFFER_BYTES) as f:
+                f.write(f"SortAnythingReport.shard({section},{shard},[")
+                for position, item in enumerate(items[start:start + REPORT_SHARD_ITEMS]):
+                    row = [item.name, str(item.path), item.size if item.is_file else None,
+                           item.modified.strftime('%Y-%m-%d %H:%M:%S'), dict(item.attributes) or None]
+                    f.write(("," if position else "") + json.dumps(row, separators=(',', ':')) + "\n")
+                    yield
+                f.write("]);\n")
+
+def _replace_directory(source, target):
+    """Move ``source`` to ``target``, replacing an existing ``target`` folder."""
+    previous = target + '.old'
+    shutil.rmtree(previous, ignore_errors=True)
+    if os.path.exists(target):
+        os.replace(target, previous)
+    os.replace(source, target)
+    shutil.rmtree(previous, ignore_errors=True)
+
+def _attribute_columns(buckets, skipped):
+    """Attribute keys over all exported items, in first-seen order."""
+    columns = {}
+    for items in [items for _name, _color, items in buckets] + [skipped]:
+        for item in items:
+            if item.attributes:
+                columns.update(dict.fromkeys(item.attributes))
+    return list(columns)
+
+def _export_rows(buckets, skipped):
+    """(bucket name or None, skipped, item) for every exported item."""
+    for name, _color, items in buckets:
+        for item in items:
+            yield name, False, item
+    for item in skipped:
+        yield None, True, item
+
+def write_ndjson_export(out, buckets, skipped):
+    """Write one typed JSON object per line (sizes in bytes, mtimes as epoch seconds); yields after each item."""
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    for bucket, is_skipped, item in _export_rows(buckets, skipped):
+        out.write(dumps({"bucket": bucket, "skipped": is_skipped, "name": item.name, "path": str(item.path),
+                         "is_file": item.is_file, "size": item.size, "mtime": item.mtime,
+                         "attributes": dict(item.attributes)}) + "\n")
+        yield
+
+def write_parquet_export(out, buckets, skipped):
+    """Write a Parquet file in row groups of EXPORT_BATCH_ITEMS (needs pyarrow); yields after each item.
+
+    Attributes become nullable string columns named ``attributes.<key>``.
+    """
+    pa = _optional_module('pyarrow')
+    pq = _optional_module('pyarrow.parquet')
+    if pa is None or pq is None:
+        raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+    attribute_columns = _attribute_columns(buckets, skipped)
+    schema = pa.schema([("bucket", pa.string()), ("skipped", pa.bool_()), ("name", pa.string()),
+                        ("path", pa.string()), ("is_file", pa.bool_()), ("size", pa.int64()),
+                        ("mtime", pa.timestamp('us', tz='UTC'))]
+                       + [(f"attributes.{key}", pa.string()) for key in attribute_columns])
+    writer = pq.ParquetWriter(out, schema, compression='zstd')
+    try:
+        rows = _export_rows(buckets, skipped)
+        while True:
+            columns = [[] for _ in schema.names]
+            for bucket, is_skipped, item in itertools.islice(rows, EXPORT_BATCH_ITEMS):
+                values = (bucket, is_skipped, item.name, str(item.path), item.is_file, item.size,
+                          int(item.mtime * 1_000_000))
+                for column, value in zip(columns, values):
+                    column.append(value)
+                attributes = item.attributes
+                for column, key in zip(columns[len(values):], attribute_columns):
+                    value = attributes.get(key)
+                    column.append(None if value is None else str(value))
+                yield
+            if not columns[0]:
+                break
+            writer.write_table(pa.Table.from_arrays(
+                [pa.array(column, type=field.type) for column, field in zip(columns, schema)], schema=schema))
+    finally:
+        writer.close()
+
+EXPORT_WRITERS = {"json": write_json_export, "csv": write_csv_export,
+                  "txt": write_txt_export, "html": write_html_export,
+                  "html_paged": write_paged_html_export, "ndjson": write_ndjson_export,
+                  "parquet": write_parquet_export}
+BINARY_EXPORT_FORMATS = {"parquet"}
+
+class _CountingTextWriter:
+    """Text stream over a buffered binary file that counts the encoded bytes written.
+
+    Stands in for a text-mode file so progress can report bytes without
+    calling tell(), which flushes a text stream. ``newline`` works as in open().
+    """
+    def __init__(self, raw, newline=None):
+        self.raw = raw
+        self.bytes_written = 0
+        self._linesep = os.linesep if newline is None and os.linesep != '\n' else None
+
+    def write(self, text):
+        data = (text.replace('\n', self._linesep) if self._linesep else text).encode('utf-8')
+        self.raw.write(data)
+        self.bytes_written += len(data)
+        return len(text)
+
+class ResultExporter(BackgroundJob):
+    """Writes an export file in the background through a large write buffer.
+
+    ``buckets`` is a list of (name, color, items) and ``skipped`` a list of
+    items, both copied on the Tk thread. The writer for ``format_type``
+    (see EXPORT_WRITERS) streams to a temporary file that replaces
+    ``filename`` only once it is complete (the data shards of a paged HTML
+    report go to a temporary folder that likewise replaces the one named
+    by paged_report_data_dir). Progress payloads are
+    (done, total, bytes written); ``elapsed`` and ``bytes_written`` are set
+    when the job finishes.
+    """
+    activity = "exporting"
+
+    def __init__(self, filename, format_type, buckets, skipped):
+        super().__init__()
+        self.filename = filename
+        self.writer = EXPORT_WRITERS[format_type]
+        self.binary = format_type in BINARY_EXPORT_FORMATS
+        self.data_dir = paged_report_data_dir(filename) if format_type == "html_paged" else None
+        self.writer_options = {"data_dir": self.data_dir, "shard_dir": self.data_dir + '.part'} if self.data_dir else {}
+        self.buckets = buckets
+        self.skipped = skipped
+        self.total = sum(len(items) for _name, _color, items in buckets) + len(skipped)
+        self.elapsed = 0.0
+        self.bytes_written = 0
+
+    def run(self):
+        started = time.perf_counter()
+        temp_path = self.filename + '.part'
+        temp_dir = self.writer_options.get("shard_dir")
+        if temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)  # Left by an interrupted export
+        try:
+            with open(temp_path, 'wb', buffering=EXPORT_BUFFER_BYTES) as raw:
+                if self.binary:
+                    out, written = raw, raw.tell  # Cheap on a binary stream: no flush
+                else:
+                    out = _CountingTextWriter(raw, '' if self.writer is write_csv_export else None)
+                    written = lambda: out.bytes_written
+                for done, _ in enumerate(self.writer(out, self.buckets, self.skipped, **self.writer_options), 1):
+                    if self.cancelled:
+                        break
+                    if done % EXPORT_PROGRESS_ITEMS == 0:
+                        self.queue.put(('progress', (done, self.total, written())))
+            if self.cancelled:
+                os.remove(temp_path)
+                if temp_dir:
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+                return
+            self.bytes_written = os.path.getsize(temp_path)
+            if temp_dir:
+                _replace_directory(temp_dir, self.data_dir)
+            os.replace(temp_path, self.filename)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            if temp_dir:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+            raise
+        self.elapsed = time.perf_counter() - started
+        self.queue.put(('progress', (self.total, self.total, self.bytes_written)))
+
+class VirtualTreeView:
+    """Shows a window of a large item list in a ttk.Treeview.
+
+    Only the rows inside the viewport (plus a small overscan) exist as
+    Treeview items. The scrollbar tracks the position within ``items``, so a
+    refresh costs time proportional to the window height, not the list size.
+    """
+    def __init__(self, tree, scrollbar, row_builder, overscan=VIRTUAL_OVERSCAN):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_builder = row_builder  # item -> (values, tags)
+        self.overscan = overscan
+        self.items = []
+        self.offset = 0
+        self.anchor = None  # Position of the last clicked row, for shift-click ranges
+        self._row_positions = {}  # iid -> position in items, for rendered rows only
+        self._row_height = VIRTUAL_DEFAULT_ROW_HEIGHT
+        self._header_height = VIRTUAL_DEFAULT_ROW_HEIGHT
+        self._rendered_rows = 0
+
+        scrollbar.configure(command=self.yview)
+        tree.bind('<Configure>', lambda e: self.render(), add='+')
+        tree.bind('<MouseWheel>', self._on_mousewheel)
+        tree.bind('<Button-4>', lambda e: self._scroll_by(-3))
+        tree.bind('<Button-5>', lambda e: self._scroll_by(3))
+        tree.bind('<Prior>', lambda e: self._scroll_by(-self.page_size()))
+        tree.bind('<Next>', lambda e: self._scroll_by(self.page_size()))
+
+    def page_size(self):
+        """Number of rows that fit in the viewport."""
+        height = self.tree.winfo_height()
+        if height <= 1:
+            return 50  # Not mapped yet; render a reasonable first page
+        return max(1, (height - self._header_height) // max(self._row_height, 1) + 1)
+
+    def set_items(self, items):
+        """Replace the backing list and redraw, keeping the scroll position if possible."""
+        self.items = items
+        self.anchor = None
+        self.render()
+
+    def append_items(self, items):
+        """Extend the backing list; only redraws if the new rows are on screen."""
+        if not items:
+            return
+        self.items.extend(items)
+        if self._rendered_rows < self.page_size() + self.overscan:
+            self.render()
+        else:
+            self._update_scrollbar()
+
+    def render(self):
+        """Materialize the rows for the current viewport."""
+        page = self.page_size()
+        max_offset = max(0, len(self.items) - page)
+        self.offset = min(max(0, self.offset), max_offset)
+        window = self.items[self.offset:self.offset + page + self.overscan]
+
+        children = self.tree.get_children()
+        if children:
+            self.tree.delete(*children)
+        self._row_positions = {}
+        for position, item in enumerate(window, self.offset):
+            values, tags = self.row_builder(item)
+            iid = str(item.uid)
+            self.tree.insert('', 'end', iid=iid, values=values, tags=tags)
+            self._row_positions[iid] = position
+        self._rendered_rows = len(window)
+        self._measure_rows()
+        self._update_scrollbar()
+
+    def position_of(self, iid):
+        """Position in ``items`` of a rendered row, or None."""
+        return self._row_positions.get(iid)
+
+    def refresh_item(self, item):
+        """Update a single row in place if it is currently rendered."""
+        iid = str(item.uid)
+        if iid in self._row_positions:
+            values, tags = self.row_builder(item)
+            self.tree.item(iid, values=values, tags=tags)
+
+    def _measure_rows(self):
+        """Pick up the real row and heading height from the first rendered row."""
+        children = self.tree.get_children()
+        if not children:
+            return
+        bbox = self.tree.bbox(children[0])
+        if bbox and bbox[3] > 0:
+            self._header_height, self._row_height = bbox[1], bbox[3]
+
+    def _update_scrollbar(self):
+        total = len(self.items)
+        if not total:
+            self.scrollbar.set(0.0, 1.0)
+            return
+        page = self.page_size()
+        self.scrollbar.set(self.offset / total, min(1.0, (self.offset + page) / total))
+
+    def yview(self, *args):
+        """Scrollbar command: ('moveto', fraction) or ('scroll', n, 'units'|'pages')."""
+        if not args:
+            return
+        if args[0] == 'moveto':
+            self.offset = int(float(args[1]) * len(self.items))
+            self.render()
+        elif args[0] == 'scroll':
+            step = int(args[1])
+            if len(args) > 2 and args[2] == 'pages':
+                step *= self.page_size()
+            self._scroll_by(step)
+
+    def _scroll_by(self, rows):
+        self.offset += rows
+        self.render()
+        return 'break'
+
+    def _on_mousewheel(self, event):
+        if sys.platform == 'darwin':
+            rows = -event.delta
+        else:
+            rows = -3 * (event.delta // 120) if event.delta else 0
+        return self._scroll_by(rows)
+
 class FileSorterApp:
     """Main application class for the SortAnything."""
     def __init__(self, root):
@@ -171,7 +2515,7 @@ class FileSorterApp:
         
         # Application state
         self.current_phase = 1
-        self.files: List[FileItem] = []
+        self.files = ItemModel()
         self.buckets: List[Bucket] = []
         self.current_file_index = 0
         self.output_mode = "list"
@@ -186,8 +2530,46 @@ class FileSorterApp:
         self.bucket_button_map = {}
         self.bucket_indicator_map = {}
         self._preview_images = []
+        self.preview_cache = PreviewCache()
+        self.photo_cache = PreviewCache(PHOTO_CACHE_BYTES)  # PhotoImages; Tk thread only
+        self._preview_source_max = max(root.winfo_screenwidth(), root.winfo_screenheight())
+        self.preview_registry = create_default_preview_registry()
+        try:
+            self.thumbnail_store = ThumbnailStore()
+        except (OSError, sqlite3.Error):
+            self.thumbnail_store = None  # No writable cache dir; previews still work
+        self._thumbnail_job = None
+        self._thumbnail_quiet = False
+        try:
+            self.session_journal = SessionJournal()
+        except OSError:
+            self.session_journal = None  # No writable data dir: run without autosave
+        self._journal_buckets = None  # Bucket layout in the latest autosave snapshot
+        self._metadata_job = None
+        self._scan_snapshot = None  # Listing of the last completed scan, for incremental refresh
+        self._rescan_index = None  # path -> item while an incremental rescan runs
+        self._rescan_changed = False
+        self._rescan_new_items = []  # Items a rescan found that were not listed before
+        self._rescan_quiet = False  # Watch-mode rescans run without progress bar
+        self._rescan_select_new = False
+        self._rescan_keep_unselected = ()  # Path prefixes whose new items stay unselected
+        self._folder_watcher = None
+        self._watch_after_id = None
+        self._list_items_are_paths = False  # Imported lines were resolved as file paths
+        self.preview_prefetcher = PreviewPrefetcher(self.preview_cache, self._load_preview,
+                                                    self._load_quick_preview)
+        self._preview_item = None  # Item whose preview is currently wanted on screen
+        self._preview_drawn = None  # (item, size, quality) of the image on the label
+        self._preview_resize_after_id = None
+        self._preview_live_resize_at = 0.0
         self._resizing_image = False  # Flag to prevent recursive resizes
-        self._current_image_dimensions = None
+        self._current_preview_details = {}
+        self._scan_job = None
+        self._scan_restore_paths = set()
+        self._display_count = 0
+        self._filter_index = FilterIndex()
+        self._item_filter = ItemFilter("*")
+        self._filter_after_id = None
 
         
         # Create main notebook
@@ -200,12 +2582,32 @@ class FileSorterApp:
         self.init_phase3()
         self.init_phase4()
         
+        # Stop background work and drop the autosave when the window closes normally
+        self.root.bind('<Destroy>', self._on_destroy, add='+')
+
         # Bind hotkeys
         self.root.bind('<KeyPress>', self.handle_hotkey)
         self.root.focus_set()
         # Focus skip button when entering sorting tab
         self.notebook.bind('<<NotebookTabChanged>>', self._on_tab_change)
 
+    def _on_destroy(self, event):
+        if event.widget is self.root:
+            self.shutdown()
+
+    def shutdown(self):
+        """Stop background work and remove the autosave (the window is closing normally)."""
+        for job in (self._scan_job, self._metadata_job, self._thumbnail_job):
+            if job is not None:
+                job.cancel()
+        if self._folder_watcher is not None:
+            self._folder_watcher.stop()
+            self._folder_watcher = None
+        self.preview_prefetcher.shutdown()
+        if self.session_journal is not None:
+            self.session_journal.close(discard=True)
+            self.session_journal = None
+
     def _on_tab_change(self, event=None):
         try:
             if self.notebook.index(self.notebook.select()) == 2 and hasattr(self, 'skip_btn'):
@@ -327,6 +2729,38 @@ class FileSorterApp:
         listbox_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
         self.dir_listbox.bind('<<ListboxSelect>>', self.on_dir_select)
+
+        # Scan options (applied on the next refresh)
+        scan_options = ttk.LabelFrame(self.folder_controls, text="Scan Options")
+        scan_options.pack(fill=tk.X, padx=5, pady=5)
+        scan_options.columnconfigure(1, weight=1)
+        self.scan_recursive = tk.BooleanVar(value=False)
+        cb_recursive = ttk.Checkbutton(scan_options, text="Include Subfolders", variable=self.scan_recursive)
+        cb_recursive.grid(row=0, column=0, columnspan=2, sticky='w', padx=5, pady=2)
+        self._add_tooltip(cb_recursive, "List the files inside subfolders instead of the subfolders themselves")
+        ttk.Label(scan_options, text="Max depth:").grid(row=1, column=0, sticky='w', padx=5, pady=2)
+        self.scan_max_depth = tk.StringVar(value="")
+        depth_spin = ttk.Spinbox(scan_options, from_=0, to=99, width=5, textvariable=self.scan_max_depth)
+        depth_spin.grid(row=1, column=1, sticky='w', padx=5, pady=2)
+        self._add_tooltip(depth_spin, "How many subfolder levels to descend (empty = no limit, 0 = top folder only)")
+        ttk.Label(scan_options, text="Include:").grid(row=2, column=0, sticky='w', padx=5, pady=2)
+        self.scan_include = tk.StringVar(value="")
+        include_entry = ttk.Entry(scan_options, textvariable=self.scan_include)
+        include_entry.grid(row=2, column=1, sticky='ew', padx=5, pady=2)
+        self._add_tooltip(include_entry, "Only list files matching these patterns, e.g. *.jpg;*.png\n"
+                          "(patterns with '/' match the path below the folder)")
+        ttk.Label(scan_options, text="Exclude:").grid(row=3, column=0, sticky='w', padx=5, pady=2)
+        self.scan_exclude = tk.StringVar(value="")
+        exclude_entry = ttk.Entry(scan_options, textvariable=self.scan_exclude)
+        exclude_entry.grid(row=3, column=1, sticky='ew', padx=5, pady=2)
+        self._add_tooltip(exclude_entry, "Skip files and whole folders matching these patterns,\n"
+                          "e.g. node_modules;*.tmp;backup/old")
+        self.watch_folders = tk.BooleanVar(value=False)
+        cb_watch = ttk.Checkbutton(scan_options, text="Watch Folders", variable=self.watch_folders,
+                                   command=self.toggle_watch_mode)
+        cb_watch.grid(row=4, column=0, columnspan=2, sticky='w', padx=5, pady=2)
+        self._add_tooltip(cb_watch, "Keep the list up to date while files are added, removed or renamed.\n"
+                          "New files are selected, so they also join the sorting queue.")
         
         # List controls
         self.list_controls = ttk.Frame(left_frame)
@@ -349,6 +2783,12 @@ class FileSorterApp:
         btn_text = ttk.Button(list_btn_frame, text="Import Text", command=self.import_text)
         btn_text.pack(fill=tk.X, pady=12)
         self._add_tooltip(btn_text, "Import items from a text file (one item per line)")
+
+        self.lines_as_paths = tk.BooleanVar(value=False)
+        cb_lines_as_paths = ttk.Checkbutton(list_btn_frame, text="Treat Lines as Paths", variable=self.lines_as_paths)
+        cb_lines_as_paths.pack(fill=tk.X, pady=12)
+        self._add_tooltip(cb_lines_as_paths, "Look up imported lines on disk to show file size, date and previews.\n"
+                          "Leave off for plain lists; imports then never touch the filesystem.")
         
         # Right panel
         right_frame = ttk.Frame(main_frame)
@@ -366,7 +2806,9 @@ class FileSorterApp:
 
         btn_select_matching = ttk.Button(filter_frame, text="Select Matching", command=self.select_matching)
         btn_select_matching.pack(side=tk.LEFT, padx=5)
-        self._add_tooltip(btn_select_matching, "Select all items that match the filter (wildcards supported)")
+        self._add_tooltip(btn_select_matching, "Select all items that match the filter (wildcards supported).\n"
+                          "Separate patterns with ';', prefix '!' to exclude, 're:' for a regex,\n"
+                          "and use size>10MB or modified>2024-01-01 for size/date conditions.")
 
         btn_clear_selection = ttk.Button(filter_frame, text="Clear Selection", command=self.clear_selection)
         btn_clear_selection.pack(side=tk.LEFT, padx=5)
@@ -385,11 +2827,21 @@ class FileSorterApp:
                        variable=self.show_selected_only, command=self.toggle_show_selected)
         cb_show_selected.pack(side=tk.LEFT, padx=5)
         self._add_tooltip(cb_show_selected, "Toggle to show only the items that are currently selected")
+
+        self.warm_thumbnails = tk.BooleanVar(value=False)
+        cb_warm_thumbnails = ttk.Checkbutton(filter_frame, text="Warm Thumbnails",
+                       variable=self.warm_thumbnails, command=self.toggle_thumbnail_warmup)
+        cb_warm_thumbnails.pack(side=tk.LEFT, padx=5)
+        self._add_tooltip(cb_warm_thumbnails, "Build cached thumbnails for listed images in the background\n"
+                          "so previews appear instantly, also in later sessions")
         
-        # Item tree
+        # Item tree (virtualized: only visible rows are inserted)
         item_tree_frame, self.item_tree = self.create_tree_with_scrollbars(
-            right_frame, ('checkbox', 'Filename', 'Size', 'Modified', 'Type'))
+            right_frame, ('checkbox', 'Filename', 'Size', 'Modified', 'Type'), need_v=False)
         item_tree_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        item_v_scroll = ttk.Scrollbar(item_tree_frame, orient=tk.VERTICAL)
+        item_v_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.item_view = VirtualTreeView(self.item_tree, item_v_scroll, self._item_row)
         
         # Configure tree columns
         col_configs = {
@@ -412,6 +2864,9 @@ class FileSorterApp:
         bottom_frame.pack(fill=tk.X, padx=5, pady=5)
         self.selection_label = ttk.Label(bottom_frame, text="0 of 0 items selected")
         self.selection_label.pack(side=tk.LEFT)
+        self.scan_progress = ttk.Progressbar(bottom_frame, length=200, mode='determinate')
+        self.scan_cancel_btn = ttk.Button(bottom_frame, text="Cancel", command=self.cancel_background_jobs)
+        self._add_tooltip(self.scan_cancel_btn, "Stop the running scan or import (items found so far are kept)")
         btn_proceed1 = tk.Button(bottom_frame, text="Proceed to Configuration", command=self.proceed_to_phase2,
                  bg=DARK_COLORS['success'], fg="black", activebackground="#45a049", 
                  font=('Arial', 10, 'bold'))
@@ -463,17 +2918,22 @@ class FileSorterApp:
             for bucket in self.buckets:
                 bucket.items.clear()
             self.buckets.clear()
+            self._cancel_scan()
             self.files.clear()
             self.dir_listbox.delete(0, tk.END)
             self.current_file_index = 0
 
-        if self.input_mode_var.get() == "folder":
+        self._show_input_controls(self.input_mode_var.get())
+        self.refresh_display()
+
+    def _show_input_controls(self, mode):
+        """Show the folder or list input panel in Phase 1."""
+        if mode == "folder":
             self.folder_controls.pack(fill=tk.BOTH, expand=True)
             self.list_controls.pack_forget()
         else:
             self.folder_controls.pack_forget()
             self.list_controls.pack(fill=tk.BOTH, expand=True)
-        self.refresh_display()
     
     def paste_from_clipboard(self):
         """Paste items from clipboard."""
@@ -482,95 +2942,87 @@ class FileSorterApp:
             lines = [line.strip() for line in content.strip().split('\n') if line.strip()]
             
             self.csv_headers = None
+            self._cancel_scan()
             self.files.clear()
             
-            for line in lines:
-                file_item = FileItem(line)
-                file_item.name = line
-                file_item.is_file = False
-                self.files.append(file_item)
+            self.files.extend(FileItem(line, populate=False) for line in lines)
             
             self.columns_mode = 'list'
             self.configure_item_tree_columns(['checkbox', 'Item'])
-            self.refresh_display()
+            self._finish_list_import()
         except Exception as e:
             messagebox.showerror("Error", f"Failed to paste from clipboard: {e}")
     
     def import_csv(self):
-        """Import CSV file containing items."""
+        """Import CSV file containing items (streamed in the background)."""
         filename = filedialog.askopenfilename(
-            title="Select CSV File", filetypes=[("CSV files", "*.csv")])
+            title="Select CSV File", filetypes=[("CSV files", "*.csv *.tsv"), ("All files", "*.*")])
         if not filename:
             return
-
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                reader = csv.reader(f)
-                headers = [h.strip() for h in next(reader)]
-                
-                self.csv_headers = headers
-                self.files.clear()
-
-                for row in reader:
-                    if not row:
-                        continue
-                    
-                    first_val = row[0].strip() if len(row) > 0 else ""
-                    file_item = FileItem(first_val)
-                    file_item.name = first_val
-                    file_item.is_file = False
-
-                    for i, header in enumerate(self.csv_headers):
-                        value = row[i].strip() if i < len(row) else ""
-                        if header:
-                            file_item.attributes[header] = value
-
-                    self.files.append(file_item)
-
-            self.columns_mode = 'list'
-            self.configure_item_tree_columns(['checkbox'] + self.csv_headers)
-            self.refresh_display()
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to import CSV: {e}")
+        self._start_list_import(ListImporter(filename, delimited=True))
 
     def import_text(self):
-        """Import plain text file where each line represents an item."""
+        """Import plain text file where each line represents an item (streamed in the background)."""
         filename = filedialog.askopenfilename(
-            title="Select Text File", filetypes=[("Text files", "*.txt *.text")])
+            title="Select Text File", filetypes=[("Text files", "*.txt *.text"), ("All files", "*.*")])
         if not filename:
             return
+        self._start_list_import(ListImporter(filename))
 
+    def _start_list_import(self, job):
+        """Replace the item list with the rows streamed by a ListImporter."""
+        self.csv_headers = None
+        self._cancel_scan()
+        self.files.clear()
+        self.columns_mode = 'list'
+        self.configure_item_tree_columns(['checkbox', 'Item'])
+        self.refresh_display()
+        self._scan_job = job
+        self._show_progress()
+        job.start()
+        self.root.after(SCAN_POLL_MS, self._poll_scan, job, self._finish_list_import)
+    
+    def _finish_list_import(self):
+        """Show freshly imported list items, resolving them as paths if the user opted in."""
+        self._list_items_are_paths = self.lines_as_paths.get()
+        self.refresh_display()
+        if self._list_items_are_paths and len(self.files):
+            self._metadata_job = MetadataResolver(self.files)
+            self._show_progress(len(self.files))
+            self._metadata_job.start()
+            self.root.after(SCAN_POLL_MS, self._poll_metadata, self._metadata_job)
+
+    def _poll_metadata(self, job):
+        if job is not self._metadata_job:
+            return
+        finished = False
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                lines = [line.strip() for line in f.readlines() if line.strip()]
-
-            self.csv_headers = None
-            self.files.clear()
-
-            for line in lines:
-                file_item = FileItem(line)
-                file_item.name = line
-                file_item.is_file = False
-                self.files.append(file_item)
-
-            self.configure_item_tree_columns(['checkbox', 'Item'])
-            self.columns_mode = 'list'
+            while True:
+                kind, payload = job.queue.get_nowait()
+                if kind == 'progress':
+                    self.scan_progress.configure(value=payload[0])
+                elif kind == 'done':
+                    finished = True
+                    break
+        except queue.Empty:
+            pass
+        if finished:
+            self._metadata_job = None
+            self._hide_progress()
+            self._filter_index = FilterIndex()  # Size/date predicates see new values
             self.refresh_display()
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to import text file: {e}")
-    
+        else:
+            self.root.after(SCAN_POLL_MS, self._poll_metadata, job)
+
     def get_filtered_items(self):
         """Get items matching the current filter."""
-        filter_pattern = self.filter_var.get().strip()
-        if not filter_pattern:
-            return self.files
-        return [f for f in self.files if fnmatch.fnmatch(f.name.lower(), filter_pattern.lower())]
+        filter_text = self.filter_var.get().strip()
+        if filter_text != self._item_filter.text:
+            self._item_filter = ItemFilter(filter_text)
+        return self._filter_index.filter(self.files, self._item_filter)
     
     def refresh_display(self):
         """Refresh the item tree display."""
-        for item_id in self.item_tree.get_children():
-            self.item_tree.delete(item_id)
-
         filtered_items = self.get_filtered_items()
 
         # Configure columns based on current mode
@@ -582,33 +3034,43 @@ class FileSorterApp:
         if getattr(self, 'current_columns', []) != expected_cols:
             self.configure_item_tree_columns(expected_cols, {'checkbox': '✓'} if self.columns_mode != 'list' else None)
 
-        # Populate rows
-        for file_item in filtered_items:
-            if self.show_selected_only.get() and not file_item.selected:
-                continue
-
-            checkbox_symbol = "✓" if file_item.selected else ""
-            
-            if self.input_mode_var.get() == 'list':
-                if self.csv_headers:
-                    row_values = [checkbox_symbol] + [file_item.attributes.get(h, "") for h in self.csv_headers]
-                else:
-                    row_values = [checkbox_symbol, file_item.name]
-            else:
-                size_str = f"{file_item.size:,} bytes" if file_item.is_file else "N/A"
-                modified_str = file_item.modified.strftime("%Y-%m-%d %H:%M")
-                type_str = self._get_file_type(file_item)
-                row_values = [checkbox_symbol, file_item.name, size_str, modified_str, type_str]
-
-            self.item_tree.insert('', 'end', values=row_values,
-                                  tags=('selected' if file_item.selected else 'unselected'))
-
+        # Populate rows for the visible window only
+        if self.show_selected_only.get():
+            visible_items = [f for f in filtered_items if f.selected]
+        else:
+            visible_items = list(filtered_items)
         self.item_tree.tag_configure('selected', background=DARK_COLORS['active'])
+        self.item_view.set_items(visible_items)
 
-        # Update selection counter
-        selected_count = sum(1 for f in self.files if f.selected)
-        total_count = len(filtered_items)
-        self.selection_label.config(text=f"{selected_count} of {total_count} items selected")
+        self._display_count = len(filtered_items)
+        self._update_selection_label()
+
+    def _item_row(self, file_item):
+        """Return (values, tags) for an item row in the Phase 1 tree."""
+        checkbox_symbol = "✓" if file_item.selected else ""
+        
+        if self.input_mode_var.get() == 'list':
+            if self.csv_headers:
+                row_values = [checkbox_symbol] + [file_item.attributes.get(h, "") for h in self.csv_headers]
+            else:
+                row_values = [checkbox_symbol, file_item.name]
+        else:
+            size_str = f"{file_item.size:,} bytes" if file_item.is_file else "N/A"
+            modified_str = file_item.modified.strftime("%Y-%m-%d %H:%M")
+            type_str = self._get_file_type(file_item)
+            row_values = [checkbox_symbol, file_item.name, size_str, modified_str, type_str]
+
+        return row_values, ('selected' if file_item.selected else 'unselected',)
+
+    def _update_selection_label(self):
+        """Update the "N of M items selected" counter, with scan progress if running."""
+        selected_count = self.files.selected_count
+        text = f"{selected_count} of {self._display_count} items selected"
+        if self._item_filter.errors:
+            text += f" — filter: {self._item_filter.errors[0]}"
+        if self._scan_job is not None and not (self._rescan_index is not None and self._rescan_quiet):
+            text += f" ({self._scan_job.activity}... {len(self.files):,} found)"
+        self.selection_label.config(text=text)
 
     def _get_file_type(self, file_item):
         """Determine file type display string."""
@@ -628,37 +3090,38 @@ class FileSorterApp:
         self.refresh_items()
     
     def toggle_item_selection(self, event):
-        """Toggle item selection when clicked."""
-        item = self.item_tree.selection()[0] if self.item_tree.selection() else None
-        if not item:
+        """Toggle the clicked item; shift-click applies the same state to the range from the last click."""
+        if self.item_tree.identify_region(event.x, event.y) not in ('cell', 'tree'):
             return
-        
-        values = self.item_tree.item(item, 'values')
-        if not values or len(values) < 2:
+        view = self.item_view
+        position = view.position_of(self.item_tree.identify_row(event.y))
+        if position is None:
             return
-        
-        key_value = values[1]
-        
-        if self.input_mode_var.get() == 'folder':
-            match_fn = lambda fi: fi.name == key_value
+
+        file_item = view.items[position]
+        if event.state & 0x0001 and view.anchor is not None and view.anchor < len(view.items):
+            # Shift-click: one batched update for the whole range
+            new_state = view.items[view.anchor].selected
+            lo, hi = sorted((view.anchor, position))
+            changed = view.items[lo:hi + 1]
+            self.files.select_many(changed, new_state)
         else:
-            if self.csv_headers:
-                first_col = self.csv_headers[0]
-                match_fn = lambda fi: fi.attributes.get(first_col, fi.name) == key_value
-            else:
-                match_fn = lambda fi: fi.name == key_value
-        
-        for file_item in self.files:
-            if match_fn(file_item):
-                file_item.selected = not file_item.selected
-                break
-        
-        self.refresh_display()
+            self.files.set_selected(file_item, not file_item.selected)
+            changed = [file_item]
+        view.anchor = position
+
+        if self.show_selected_only.get() and not all(fi.selected for fi in changed):
+            # Deselected rows drop out of the "selected only" view
+            view.set_items([fi for fi in view.items if fi.selected])
+        elif len(changed) == 1:
+            view.refresh_item(file_item)
+        else:
+            view.render()
+        self._update_selection_label()
     
     def proceed_to_phase2(self):
         """Move to Phase 2: Bucket Configuration."""
-        selected_items = [f for f in self.files if f.selected]
-        if not selected_items:
+        if not self.files.selected_count:
             messagebox.showwarning("No Selection", "Please select at least one item to sort.")
             return
 
@@ -667,28 +3130,353 @@ class FileSorterApp:
         self.notebook.select(1)
     
     def refresh_items(self):
-        """Refresh the item list based on selected directories."""
-        # Preserve current selections by path
+        """Refresh the item list based on selected directories.
+
+        Directories are scanned by a background DirectoryScanner; batches are
+        merged into the list by _poll_scan so the window stays responsive.
+        After a completed scan with the same options the refresh is
+        incremental: only folders whose mtime changed are listed again, and
+        the differences are merged into the existing items, so selection,
+        bucket and skip state are kept as they are.
+        """
+        directories = list(self.dir_listbox.get(0, tk.END))
+        if directories and self._start_rescan(directories, self._scan_options()):
+            return
+
+        # Preserve current selections by path (including any not yet restored by a running scan)
         previously_selected_paths = {str(f.path) for f in self.files if getattr(f, 'selected', False)}
+        if self._scan_job is not None:
+            previously_selected_paths |= self._scan_restore_paths
+        self._cancel_scan()
         self.files.clear()
-        for directory in self.dir_listbox.get(0, tk.END):
-            try:
-                path = Path(directory)
-                if path.exists() and path.is_dir():
-                    for item in path.iterdir():
-                        if not item.name.startswith('.'):
-                            fi = FileItem(str(item))
-                            if str(fi.path) in previously_selected_paths:
-                                fi.selected = True
-                            self.files.append(fi)
-            except PermissionError:
-                messagebox.showwarning("Permission Error", f"Cannot access directory: {directory}")
         
         self.columns_mode = 'folder'
         self.configure_item_tree_columns(['checkbox', 'Filename', 'Size', 'Modified', 'Type'],
                                          headers_mapping={'checkbox': '✓'})
+
+        if directories:
+            self._scan_restore_paths = previously_selected_paths
+            job = self._scan_job = DirectoryScanner(directories, **self._scan_options())
+            self._show_progress(len(directories))
+            job.start()
+            self.root.after(SCAN_POLL_MS, self._poll_scan, job, lambda: self._on_scan_done(job))
         self.refresh_display()
+
+    def _start_rescan(self, directories, options, watch=False):
+        """Start an incremental rescan against the last snapshot; False if a full scan is needed.
+
+        Watch-mode rescans run quietly and select new items so they join the sorting queue.
+        """
+        if self._scan_snapshot is None or self.columns_mode != 'folder':
+            return False
+        job = DirectoryScanner(directories, previous=self._scan_snapshot, **options)
+        if job.previous is None:
+            return False  # Scan options changed since the snapshot
+        if watch:
+            self._cancel_scan_job()  # Leave metadata and thumbnail work alone
+        else:
+            self.cancel_background_jobs()
+        self._rescan_index = self.files.paths  # Kept current by the model: no O(n) rebuild per rescan
+        self._rescan_keep_unselected = self._bucket_destinations() if watch else ()
+        self._rescan_changed = False
+        self._rescan_new_items = []
+        self._rescan_quiet = self._rescan_select_new = watch
+        self._scan_job = job
+        if not watch:
+            self._show_progress(len(directories))
+        job.start()
+        self.root.after(SCAN_POLL_MS, self._poll_scan, job, lambda: self._on_scan_done(job))
+        self._update_selection_label()
+        return True
+
+    def toggle_watch_mode(self):
+        if self.watch_folders.get():
+            if self._scan_snapshot is None and self._scan_job is None:
+                self.refresh_items()  # Watching works on top of a completed scan
+            self._poll_watch()
+        else:
+            if self._watch_after_id is not None:
+                self.root.after_cancel(self._watch_after_id)
+                self._watch_after_id = None
+            if self._folder_watcher is not None:
+                self._folder_watcher.stop()
+                self._folder_watcher = None
+
+    def _poll_watch(self):
+        """Rescan incrementally when the watcher reports changes (runs while Watch Folders is on)."""
+        self._watch_after_id = None
+        if not self.watch_folders.get():
+            return
+        snapshot = self._scan_snapshot
+        directories = list(self.dir_listbox.get(0, tk.END))
+        if snapshot is not None:
+            options = dict(zip(('recursive', 'max_depth', 'include', 'exclude'), snapshot.options))
+            watcher = self._folder_watcher
+            if watcher is None or watcher.directories != directories or watcher.recursive != options['recursive']:
+                if watcher is not None:
+                    watcher.stop()
+                watcher = self._folder_watcher = FolderWatcher(directories, options['recursive'])
+            if self._scan_job is None and watcher.changed():
+                self._start_rescan(directories, options, watch=True)
+        self._watch_after_id = self.root.after(WATCH_POLL_MS, self._poll_watch)
+
+    def _scan_options(self):
+        """DirectoryScanner keyword arguments from the Scan Options panel."""
+        split = lambda text: [p.strip() for p in text.split(';') if p.strip()]
+        try:
+            max_depth = max(0, int(self.scan_max_depth.get()))
+        except ValueError:
+            max_depth = None
+        return {'recursive': self.scan_recursive.get(), 'max_depth': max_depth,
+                'include': split(self.scan_include.get()), 'exclude': split(self.scan_exclude.get())}
+
+    def _cancel_scan(self):
+        """Stop background work on the item list before it is replaced; queued batches are discarded."""
+        self.cancel_background_jobs()
+        self._list_items_are_paths = False
+        self._scan_snapshot = None
+
+    def cancel_background_jobs(self):
+        """Stop any running scan, import, metadata pass or thumbnail warm-up, keeping items loaded so far."""
+        self._cancel_thumbnail_warmup()
+        if self._metadata_job is not None:
+            self._metadata_job.cancel()
+            self._metadata_job = None
+        self._cancel_scan_job()
+        self._hide_progress()
+
+    def _cancel_scan_job(self):
+        """Stop a running scan or import (only), keeping items loaded so far."""
+        if self._scan_job is None:
+            return
+        quiet = self._rescan_index is not None and self._rescan_quiet
+        self._scan_job.cancel()
+        self._scan_job = None
+        self._scan_restore_paths = set()
+        self._scan_snapshot = None  # Items may reflect a partial scan now
+        if self._rescan_index is not None:
+            self._rescan_index = None
+            self.refresh_display()
+        self._update_selection_label()
+        if not quiet:
+            self._hide_progress()
+
+    def _show_progress(self, maximum=1):
+        self.scan_progress.configure(maximum=maximum, value=0)
+        self.scan_progress.pack(side=tk.LEFT, padx=10)
+        self.scan_cancel_btn.pack(side=tk.LEFT)
+
+    def _hide_progress(self):
+        self.scan_progress.pack_forget()
+        self.scan_cancel_btn.pack_forget()
+
+    def _poll_scan(self, job, on_done=None, on_ready=None):
+        """Drain scan or import results on the Tk thread and append them to the list.
+
+        ``on_done`` is called once the job has finished without being cancelled,
+        ``on_ready`` when the job reports that enough items are in to use them.
+        """
+        if job is not self._scan_job:
+            return  # Cancelled or superseded by a newer scan
+
+        new_items = []
+        finished = ready = False
+        warnings = []
+        errors = []
+        try:
+            for _ in range(SCAN_MAX_BATCHES_PER_POLL):
+                kind, payload = job.queue.get_nowait()
+                if kind == 'batch':
+                    new_items.extend(payload)
+                elif kind == 'folder':
+                    new_items.extend(self._merge_rescanned(payload[1]))
+                elif kind == 'removed':
+                    self._remove_rescanned(payload)
+                elif kind == 'progress':
+                    done, total, _count = payload
+                    self.scan_progress.configure(value=done, maximum=max(total, 1))
+                elif kind == 'ready':
+                    ready = True
+                elif kind == 'columns':
+                    self.csv_headers = payload
+                    self.configure_item_tree_columns(['checkbox'] + payload)
+                elif kind == 'warning':
+                    warnings.append(payload)
+                elif kind == 'error':
+                    errors.append(f"{job.activity.capitalize()} failed: {payload}")
+                elif kind == 'done':
+                    finished = True
+                    break
+        except queue.Empty:
+            pass
+
+        if new_items:
+            restore = self._scan_restore_paths
+            item_filter = self._item_filter
+            show_selected_only = self.show_selected_only.get()
+            visible_items = []
+            for fi in new_items:
+                if restore and fi.path in restore:
+                    fi.selected = True
+                    restore.discard(fi.path)
+                if fi.bucket is not None:
+                    fi.bucket.items.add(fi)  # Restored session items arrive already sorted
+                self.files.append(fi)
+                if item_filter.is_empty or item_filter.matches(fi.name.lower(), fi):
+                    self._display_count += 1
+                    if fi.selected or not show_selected_only:
+                        visible_items.append(fi)
+            self.item_view.append_items(visible_items)
+
+        if finished:
+            self._scan_job = None
+            self._scan_restore_paths = set()
+            self._hide_progress()
+        if new_items or finished:
+            self._update_selection_label()
+
+        for message in warnings:
+            messagebox.showwarning("Permission Error", message)
+        for message in errors:
+            messagebox.showerror("Error", message)
+        if ready and on_ready is not None:
+            on_ready()
+        if not finished:
+            self.root.after(SCAN_POLL_MS, self._poll_scan, job, on_done, on_ready)
+        elif on_done is not None:
+            on_done()
+
+    def _on_scan_done(self, job):
+        self._scan_snapshot = job.snapshot
+        if self._rescan_index is not None:
+            self._rescan_index = None
+            if self._rescan_changed:
+                self._filter_index = FilterIndex()  # Sizes/dates of kept items may have changed
+                self.refresh_display()
+                if self.review_notebook.tabs():
+                    self.refresh_review()  # Review tabs may list removed files
+            sorting_item = self._preview_item
+            if sorting_item is not None and (self._rescan_changed or self._rescan_new_items):
+                # Keep the sorting view in step: the queue may have grown or lost the shown item
+                if self.files.get(sorting_item.uid) is not sorting_item:
+                    self.show_current_file()
+                else:
+                    self._update_sort_progress(self.files.selected_items())
+        if self.warm_thumbnails.get():
+            if not self._rescan_quiet:
+                self._start_thumbnail_warmup()
+            elif self._rescan_new_items and self._thumbnail_job is None:
+                self._start_thumbnail_warmup(self._rescan_new_items, quiet=True)
+        self._rescan_quiet = False
+        self._rescan_new_items = []
+
+    def _merge_rescanned(self, items):
+        """Fold a re-listed folder into the model; return the items that are new.
+
+        Known paths keep their existing item (and so its selection, bucket
+        and skip state); only their file metadata is updated.
+        """
+        index = self._rescan_index
+        keep_unselected = self._rescan_keep_unselected
+        new_items = []
+        for item in items:
+            existing = index.get(item.path)
+            if existing is None:
+                # Files just moved into a watched bucket folder must not rejoin the queue
+                item.selected = self._rescan_select_new and not (
+                    keep_unselected and os.path.normcase(os.path.abspath(item.path)).startswith(keep_unselected))
+                new_items.append(item)
+            elif (existing.mtime, existing.size, existing.is_file) != (item.mtime, item.size, item.is_file):
+                existing.mtime, existing.size, existing.is_file = item.mtime, item.size, item.is_file
+                existing.extension = item.extension
+                self._rescan_changed = True
+        self._rescan_new_items.extend(new_items)
+        return new_items
+
+    def _bucket_destinations(self):
+        """Path prefixes (normcased, ending in a separator) of the folders files are moved to."""
+        if self.output_mode_var.get() != "folder":
+            return ()
+        output_directory = self.output_directory or self.output_dir_var.get()
+        if not output_directory:
+            return ()
+        return tuple(os.path.normcase(os.path.join(os.path.abspath(output_directory), bucket.name)) + os.sep
+                     for bucket in self.buckets)
+
+    def _remove_rescanned(self, paths):
+        """Drop items whose files disappeared, keeping the sorting position on the current item."""
+        index = self._rescan_index
+        removed = [index[path] for path in paths if path in index]
+        if not removed:
+            return
+        selected_files = self.files.selected_items()
+        current = selected_files[self.current_file_index] if self.current_file_index < len(selected_files) else None
+        for item in removed:
+            if item.bucket is not None:
+                item.bucket.items.discard(item)
+                item.bucket = None
+        self.files.remove(removed)
+        position = self.files.selected_position(current) if current is not None else None
+        if position is not None:
+            self.current_file_index = position
+        self._display_count = max(0, self._display_count - len(removed))
+        self._rescan_changed = True
     
+    def toggle_thumbnail_warmup(self):
+        if self.warm_thumbnails.get():
+            if self._scan_job is None:
+                self._start_thumbnail_warmup()
+        else:
+            self._cancel_thumbnail_warmup()
+
+    def _start_thumbnail_warmup(self, items=None, quiet=False):
+        """Cache thumbnails for listed images (or ``items``) in the background, selected items first.
+
+        A ``quiet`` warm-up (new items found in watch mode) shows no progress bar.
+        """
+        self._cancel_thumbnail_warmup()
+        if self.thumbnail_store is None:
+            return
+        items = [f for f in (self.files if items is None else items)
+                 if f.is_file and self.preview_registry.find(f.extension) is render_image]
+        if not items:
+            return
+        items.sort(key=lambda f: not f.selected)
+        self._thumbnail_job = ThumbnailWarmup(self.thumbnail_store, (str(f.path) for f in items))
+        self._thumbnail_quiet = quiet
+        if not quiet:
+            self._show_progress(len(items))
+        self._thumbnail_job.start()
+        self.root.after(THUMBNAIL_WARMUP_POLL_MS, self._poll_thumbnail_warmup, self._thumbnail_job)
+
+    def _cancel_thumbnail_warmup(self):
+        if self._thumbnail_job is not None:
+            self._thumbnail_job.cancel()
+            self._thumbnail_job = None
+            if not self._thumbnail_quiet:
+                self._hide_progress()
+
+    def _poll_thumbnail_warmup(self, job):
+        if job is not self._thumbnail_job:
+            return
+        finished = False
+        try:
+            while True:
+                kind, payload = job.queue.get_nowait()
+                if kind == 'progress' and not self._thumbnail_quiet:
+                    self.scan_progress.configure(value=payload[0])
+                elif kind == 'done':
+                    finished = True
+                    break
+        except queue.Empty:
+            pass
+        if finished:
+            self._thumbnail_job = None
+            if not self._thumbnail_quiet:
+                self._hide_progress()
+        else:
+            self.root.after(THUMBNAIL_WARMUP_POLL_MS, self._poll_thumbnail_warmup, job)
+
     def refresh_button_action(self):
         """Refresh action depending on current mode."""
         if self.input_mode_var.get() == 'folder':
@@ -698,8 +3486,7 @@ class FileSorterApp:
     
     def clear_all_action(self):
         """Clear list items and selections, reset filter."""
-        for f in self.files:
-            f.selected = False
+        self._cancel_scan()
         self.files.clear()
         self.filter_var.set("*")
         self.show_selected_only.set(False)
@@ -710,17 +3497,13 @@ class FileSorterApp:
     
     def select_matching(self):
         """Select all files matching the current filter."""
-        filter_pattern = self.filter_var.get().strip()
-        if filter_pattern:
-            for file_item in self.files:
-                if fnmatch.fnmatch(file_item.name.lower(), filter_pattern.lower()):
-                    file_item.selected = True
+        if self.filter_var.get().strip():
+            self.files.select_many(self.get_filtered_items(), True)
             self.refresh_display()
     
     def clear_selection(self):
         """Clear all file selections."""
-        for file_item in self.files:
-            file_item.selected = False
+        self.files.select_many(self.files.selected_items()[:], False)
         self.refresh_display()
     
     def toggle_show_selected(self):
@@ -728,7 +3511,13 @@ class FileSorterApp:
         self.refresh_display()
     
     def apply_filter(self, *args):
-        """Apply the current filter to the item display."""
+        """Apply the current filter once typing pauses for FILTER_DEBOUNCE_MS."""
+        if self._filter_after_id is not None:
+            self.root.after_cancel(self._filter_after_id)
+        self._filter_after_id = self.root.after(FILTER_DEBOUNCE_MS, self._apply_filter_now)
+
+    def _apply_filter_now(self):
+        self._filter_after_id = None
         self.refresh_display()
 
     def init_phase2(self):
@@ -971,7 +3760,7 @@ class FileSorterApp:
 
     def _jump_to_item(self, index):
         """Jump to specific item index."""
-        selected_files = [f for f in self.files if f.selected]
+        selected_files = self.files.selected_items()
         if selected_files:
             self.current_file_index = index if index >= 0 else len(selected_files) - 1
             self.show_current_file()
@@ -984,7 +3773,7 @@ class FileSorterApp:
     
     def next_file(self):
         """Go to next file without changing any association."""
-        selected_files = [f for f in self.files if f.selected]
+        selected_files = self.files.selected_items()
         if self.current_file_index < len(selected_files) - 1:
             self.current_file_index += 1
         else:
@@ -993,18 +3782,18 @@ class FileSorterApp:
     
     def skip_file(self):
         """Skip the current file without sorting."""
-        selected_files = [f for f in self.files if f.selected]
+        selected_files = self.files.selected_items()
         if self.current_file_index < len(selected_files):
             current = selected_files[self.current_file_index]
             # Remove any existing bucket association
             if current.bucket:
-                try:
-                    current.bucket.items.remove(current)
-                except ValueError:
-                    pass
+                current.bucket.items.discard(current)
                 current.bucket = None
             current.skipped = True
-        self.current_file_index += 1
+            self.current_file_index += 1
+            self._journal_event('skip', current)
+        else:
+            self.current_file_index += 1
         self.show_current_file()
 
     def _add_tooltip(self, widget, text):
@@ -1052,7 +3841,7 @@ class FileSorterApp:
 
     def on_preview_click(self, event):
         """Handle click on preview to open file in associated application."""
-        selected_files = [f for f in self.files if f.selected]
+        selected_files = self.files.selected_items()
         if self.current_file_index < len(selected_files):
             current_file = selected_files[self.current_file_index]
             self._open_file(current_file.path)
@@ -1073,69 +3862,199 @@ class FileSorterApp:
             messagebox.showerror("Error", f"Failed to open file: {str(e)}")
 
     def update_preview(self, file_item):
-        """Update the preview area for the current file."""
+        """Update the preview area for the current file.
+
+        Previews come from the renderer registered for the file type and are
+        produced on the prefetch workers; cached results are shown at once.
+        """
         # Clear existing preview
         for widget in self.preview_frame.winfo_children():
             if widget != self.preview_label:
                 widget.destroy()
         
         # Clear the preview label completely
-        self.preview_label.config(image='', text='', compound=tk.TOP)
+        self.preview_label.unbind("<Configure>")
+        if self._preview_resize_after_id is not None:
+            self.root.after_cancel(self._preview_resize_after_id)
+            self._preview_resize_after_id = None
+        self._preview_drawn = None
+        self.preview_label.config(image='', text='', compound=tk.TOP, font='')
         
-        preview_handlers = {
-            'text': ['.txt', '.py', '.md'],
-            'image': ['.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp']
-        }
-        
-        if file_item.is_file and file_item.extension in preview_handlers['text']:
-            self._current_image_dimensions = None
-            self._preview_text_file(file_item.path)
-        elif file_item.is_file and file_item.extension in preview_handlers['image']:
-            self._preview_image_file(file_item.path)
+        self._preview_item = file_item
+        self._current_preview_details = {}
+        if not file_item.is_file:
+            self._show_preview_message("No preview available")
+            return
+
+        key = self._preview_source_key(file_item)
+        result = self.preview_cache.get(key)
+        if result is not None:
+            self._show_preview_result(file_item, result)
+        else:
+            # Render on a worker; the UI stays responsive meanwhile
+            use_quick = PREVIEW_PROGRESSIVE or self.thumbnail_store is not None
+            quick_key = self._preview_quick_key(file_item) if use_quick else None
+            future = self.preview_prefetcher.request(key, str(file_item.path), quick_key)
+            self._show_preview_message("Loading preview...")
+            self.root.after(PREVIEW_POLL_MS, self._poll_preview, file_item, future, False)
+
+    def _show_preview_message(self, text):
+        self.preview_label.config(image='', anchor='center', font='', text=text, foreground="#cccccc")
+
+    def _show_preview_result(self, file_item, result):
+        """Display a renderer result as an image, text or monospaced text."""
+        self._current_preview_details = result.details
+        if result.kind == 'image':
+            self._show_preview_image(file_item)
+        elif result.kind == 'text':
+            self.preview_label.config(image='', text=result.content, anchor='center', font='', foreground="#ffffff")
+        elif result.kind == 'mono':
+            self.preview_label.config(image='', text=result.content, anchor='nw', justify=tk.LEFT,
+                                      font=('Courier New', 10), foreground="#cccccc")
         else:
-            self._current_image_dimensions = None
-            self.preview_label.config(image='', anchor='center' , text="No preview available", foreground="#cccccc")
+            self._show_preview_message(result.content)
 
-    def _preview_text_file(self, file_path):
-        try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                content = f.read(1500)
-                self.preview_label.config(text=f"{content}...", foreground="#ffffff")
-        except Exception:
-            self.preview_label.config(text="Cannot preview this file", anchor='center' , foreground="#cccccc")
+    def _poll_preview(self, file_item, future, quick_shown):
+        """Show a preview rendered by a worker once it is ready, if still current.
 
-    def _preview_image_file(self, file_path):
+        While a full image decode runs, the quick render is shown as soon as it exists.
+        """
+        if file_item is not self._preview_item:
+            return
+        if not future.done():
+            if not quick_shown and self._preview_quick_key(file_item) in self.preview_cache:
+                self._resize_image(file_item, quick=True)
+                quick_shown = True
+            self.root.after(PREVIEW_POLL_MS, self._poll_preview, file_item, future, quick_shown)
+            return
+        if not future.cancelled() and future.exception() is not None:
+            self._show_preview_message(f"Cannot preview this file: {future.exception()}")
+            return
         try:
-            self.preview_label.unbind("<Configure>")
-            # Initial display
-            self._resize_image(file_path)
-            # Bind to configure event to handle resizing
-            self.preview_label.bind("<Configure>", lambda e: self._resize_image(file_path))
+            self._show_preview_result(file_item, self._preview_source(file_item))
         except Exception as e:
-            self.preview_label.config(
-                image='',
-                anchor='center' ,
-                text=f"Failed to load image: {str(e)}",
-                foreground="#cccccc"
-            )
-
-    def _resize_image(self, file_path):
-        """Resize image to fit preview label, without upscaling."""
+            self._show_preview_message(f"Cannot preview this file: {e}")
+            return
+        if self._current_preview_details:
+            selected_files = self.files.selected_items()
+            if self.current_file_index < len(selected_files):
+                self._rebuild_details(file_item, selected_files)
+
+    def _show_preview_image(self, file_item):
+        """Draw a (cached) image preview and keep it fitted on resize."""
+        self.preview_frame.update_idletasks()
+        self._resize_image(file_item)
+        self.preview_label.bind("<Configure>", lambda e: self._on_preview_configure(file_item))
+
+    def _on_preview_configure(self, file_item):
+        """Coalesce bursts of <Configure> events (e.g. sash drags) into one full render.
+
+        During the burst the cached intermediate is redrawn with a cheap filter
+        at most every PREVIEW_LIVE_RESIZE_MS; the LANCZOS render happens once
+        the size has been stable for PREVIEW_RESIZE_SETTLE_MS.
+        """
+        if file_item is not self._preview_item:
+            return
+        if self._preview_resize_after_id is not None:
+            self.root.after_cancel(self._preview_resize_after_id)
+        now = time.monotonic()
+        if (now - self._preview_live_resize_at) * 1000 >= PREVIEW_LIVE_RESIZE_MS:
+            self._preview_live_resize_at = now
+            self._resize_image(file_item, live=True)
+        self._preview_resize_after_id = self.root.after(
+            PREVIEW_RESIZE_SETTLE_MS, self._settle_preview_resize, file_item)
+
+    def _settle_preview_resize(self, file_item):
+        self._preview_resize_after_id = None
+        if file_item is self._preview_item:
+            self._resize_image(file_item)
+
+    def _preview_key(self, file_item):
+        """Cache key identifying one version of a file."""
+        return (str(file_item.path), file_item.mtime)
+
+    def _preview_source_key(self, file_item):
+        return ('source',) + self._preview_key(file_item)
+
+    def _preview_quick_key(self, file_item):
+        return ('quick',) + self._preview_key(file_item)
+
+    def _load_preview(self, path):
+        """Prefetcher loader: run the registered renderer (on a worker thread).
+
+        Image results are also saved to the persistent thumbnail store.
+        """
+        result = self.preview_registry.render(path, self._preview_source_max)
+        if result is None:
+            result = PreviewResult('message', "No preview available")
+        store = self.thumbnail_store
+        if result.kind == 'image' and store is not None and not store.contains(path):
+            store.put(path, result)
+        return result, result.nbytes
+
+    def _load_quick_preview(self, path):
+        """Prefetcher loader for the first pass: a stored thumbnail, else a quick image decode."""
+        if self.thumbnail_store is not None:
+            result = self.thumbnail_store.get(path)
+            if result is not None:
+                return result, result.nbytes
+        if not PREVIEW_PROGRESSIVE or \
+                self.preview_registry.find(os.path.splitext(path)[1].lower()) is not render_image:
+            return None
+        result = render_image(path, self._preview_source_max, quick=True)
+        return result, result.nbytes
+
+    def _preview_source(self, file_item):
+        """Return the cached PreviewResult for a file, rendering it now if needed.
+
+        Image results hold an intermediate downscaled to the screen size, so
+        later resizes work from memory instead of the original file.
+        """
+        key = self._preview_source_key(file_item)
+        result = self.preview_cache.get(key)
+        if result is None:
+            result, nbytes = self._load_preview(str(file_item.path))
+            self.preview_cache.put(key, result, nbytes)
+        return result
+
+    def _prefetch_around(self, selected_files):
+        """Queue background renders for the items around the current one."""
+        if self.columns_mode == 'list' and not self._list_items_are_paths:
+            return
+        index = self.current_file_index
+        nearby = [index] + list(range(index + 1, index + 1 + PREFETCH_AHEAD)) + \
+                 list(range(index - 1, index - 1 - PREFETCH_BEHIND, -1))
+        requests = []
+        for i in nearby:
+            if 0 <= i < len(selected_files) and selected_files[i].is_file:
+                item = selected_files[i]
+                requests.append((self._preview_source_key(item), str(item.path)))
+        self.preview_prefetcher.prefetch(requests)
+
+    def _resize_image(self, file_item, quick=False, live=False):
+        """Resize image to fit preview label, without upscaling.
+
+        ``quick`` draws the low-quality first pass and ``live`` a cheap redraw
+        during a resize drag; neither is cached. Nothing is redrawn if the
+        fitted size and quality match what is already shown.
+        """
         if self._resizing_image:
             return
         try:
             self._resizing_image = True
-            self.preview_frame.update_idletasks()
             frame_width = self.preview_frame.winfo_width()
             frame_height = self.preview_frame.winfo_height()
 
             if frame_width <= 1 or frame_height <= 1:
-                self._current_image_dimensions = None
                 return
 
-            img = Image.open(file_path)
-            img_width, img_height = img.width, img.height
-            self._current_image_dimensions = (img_width, img_height)
+            if quick:
+                result = self.preview_cache.get(self._preview_quick_key(file_item))
+            else:
+                result = self._preview_source(file_item)
+            if result is None or result.kind != 'image':
+                return
+            source, (img_width, img_height) = result.content, result.size
             if img_height == 0: return # Avoid division by zero
             aspect = img_width / img_height
 
@@ -1151,19 +4070,33 @@ class FileSorterApp:
                 fit_height = int(fit_width / aspect)
 
             # Final dimensions are the smaller of the "fit" size and the original size
-            final_width = min(fit_width, img_width)
-            final_height = min(fit_height, img_height)
+            final_width = max(min(fit_width, img_width), 1)
+            final_height = max(min(fit_height, img_height), 1)
 
-            # Only resize if the final dimensions are different from the original
-            if final_width != img_width or final_height != img_height:
-                display_img = img.resize((final_width, final_height), Image.LANCZOS)
+            quality = 'quick' if quick else 'live' if live else 'full'
+            drawn = self._preview_drawn
+            if drawn and drawn[0] is file_item and drawn[1] == (final_width, final_height) \
+                    and (drawn[2] == quality or drawn[2] == 'full'):
+                return  # Fitted size unchanged
+
+            if quick or live:
+                photo = ImageTk.PhotoImage(source.resize((final_width, final_height), Image.BILINEAR))
             else:
-                display_img = img
+                photo_key = ('photo',) + self._preview_key(file_item) + (final_width, final_height)
+                photo = self.photo_cache.get(photo_key)
+                if photo is None:
+                    # Rescale the cached intermediate rather than the original file
+                    if source.size != (final_width, final_height):
+                        display_img = source.resize((final_width, final_height), Image.LANCZOS)
+                    else:
+                        display_img = source
+                    photo = ImageTk.PhotoImage(display_img)
+                    self.photo_cache.put(photo_key, photo, final_width * final_height * 4)
 
-            photo = ImageTk.PhotoImage(display_img)
             self._preview_images.clear()
             self._preview_images.append(photo)
             self.preview_label.config(image=photo, text="", compound=tk.CENTER)
+            self._preview_drawn = (file_item, (final_width, final_height), quality)
 
         except Exception as e:
             self.preview_label.config(
@@ -1178,10 +4111,10 @@ class FileSorterApp:
 
     def show_current_file(self):
         """Display the current file for sorting."""
-        selected_files = [f for f in self.files if f.selected]
+        selected_files = self.files.selected_items()
         
-        # Hide preview frame in list mode; show in folder mode
-        if self.columns_mode == 'list':
+        # Hide preview frame in list mode (unless lines are paths); show in folder mode
+        if self.columns_mode == 'list' and not self._list_items_are_paths:
             try:
                 self.side_by_side_frame.remove(self.preview_frame)
             except Exception:
@@ -1213,24 +4146,30 @@ class FileSorterApp:
         
         # Update preview first to get image dimensions
         self.update_preview(current_file)
+        self._prefetch_around(selected_files)
 
         # Rebuild details
         self._rebuild_details(current_file, selected_files)
         
-        # Update progress
-        progress = (self.current_file_index / len(selected_files)) * 100
-        self.progress_var.set(progress)
-        self.progress_label.config(text=f"{self.current_file_index} / {len(selected_files)}")
+        self._update_sort_progress(selected_files)
         
         # Update bucket indicators
         self._update_bucket_indicators(current_file.bucket)
 
+    def _update_sort_progress(self, selected_files):
+        if not selected_files:
+            return
+        progress = (self.current_file_index / len(selected_files)) * 100
+        self.progress_var.set(progress)
+        self.progress_label.config(text=f"{self.current_file_index} / {len(selected_files)}")
+
     def _show_completion(self):
         """Show completion state."""
-        total = len([f for f in self.files if f.selected])
+        total = self.files.selected_count
         self.progress_var.set(100)
         self.progress_label.config(text=f"{total} / {total}")
         self.current_filename_label.config(text="All items sorted!", anchor='center' )
+        self._preview_item = None
         
         for w in self.item_details_container.winfo_children():
             w.destroy()
@@ -1266,6 +4205,11 @@ class FileSorterApp:
             if self.csv_headers:
                 for h in self.csv_headers:
                     add_kv(h, current_file.attributes.get(h, ""))
+            if self._list_items_are_paths and current_file.is_file:
+                add_kv("Size", f"{current_file.size:,} bytes")
+                add_kv("Modified", current_file.modified.strftime('%Y-%m-%d %H:%M:%S'))
+                for key, value in self._current_preview_details.items():
+                    add_kv(key, value)
         else:
             add_kv("Path", current_file.path)
             size_str = f"{current_file.size:,} bytes" if current_file.is_file else "N/A"
@@ -1273,14 +4217,9 @@ class FileSorterApp:
             add_kv("Modified", current_file.modified.strftime('%Y-%m-%d %H:%M:%S'))
             add_kv("Type", self._get_file_type(current_file))
 
-            if self._current_image_dimensions:
-                try:
-                    width, height = self._current_image_dimensions
-                    megapixels = (width * height) / 1_000_000
-                    add_kv("Resolution", f"{width} x {height}")
-                    add_kv("Megapixels", f"{megapixels:.2f} MP")
-                except Exception:
-                    pass # Failsafe
+            # Renderer-specific rows (resolution, page count, archive entries, ...)
+            for key, value in self._current_preview_details.items():
+                add_kv(key, value)
         
         add_kv("Item", f"{self.current_file_index + 1} of {len(selected_files)}")
         add_kv("Bucket", current_file.bucket.name if current_file.bucket else "")
@@ -1299,20 +4238,18 @@ class FileSorterApp:
 
     def sort_to_bucket(self, bucket):
         """Sort current file to the specified bucket."""
-        selected_files = [f for f in self.files if f.selected]
+        selected_files = self.files.selected_items()
         if self.current_file_index < len(selected_files):
             current_file = selected_files[self.current_file_index]
             # Remove from previous bucket
             if current_file.bucket:
-                try:
-                    current_file.bucket.items.remove(current_file)
-                except ValueError:
-                    pass
+                current_file.bucket.items.discard(current_file)
             # Add to new bucket
-            bucket.items.append(current_file)
+            bucket.items.add(current_file)
             current_file.bucket = bucket
             current_file.skipped = False
             self.current_file_index += 1
+            self._journal_event('sort', current_file, b=bucket.number)
             self.show_current_file()
 
     def setup_sorting_interface(self):
@@ -1343,8 +4280,7 @@ class FileSorterApp:
 
     def proceed_to_phase3(self):
         """Move to Phase 3: Interactive Sorting."""
-        selected_items = [f for f in self.files if f.selected]
-        if not selected_items:
+        if not self.files.selected_count:
             messagebox.showwarning("No Items", "No items selected for sorting.")
             return
             
@@ -1362,6 +4298,7 @@ class FileSorterApp:
         self.setup_sorting_interface()
         self.notebook.select(2)
         self.show_current_file()
+        self._autosave_snapshot()
         try:
             self.skip_btn.focus_set()
         except Exception:
@@ -1535,6 +4472,7 @@ class FileSorterApp:
             # Reset progress and return to Phase 3
             self.current_file_index = 0
             self.setup_sorting_interface()
+            self._autosave_snapshot()
             self.notebook.select(2)
             self.show_current_file()
             messagebox.showinfo("Sorting Reset", "Sorting progress has been discarded. You can start sorting again.")
@@ -1555,7 +4493,7 @@ class FileSorterApp:
                 self._create_bucket_tab(bucket)
         
         # Create skipped items tab
-        skipped_items = [f for f in self.files if f.selected and f.skipped]
+        skipped_items = [f for f in self.files.selected_items() if f.skipped]
         if skipped_items:
             self._create_skipped_tab(skipped_items)
                 
@@ -1625,7 +4563,7 @@ class FileSorterApp:
 
         # Populate rows
         for item in items:
-            tree.insert('', 'end', values=row_builder(item))
+            tree.insert('', 'end', iid=str(item.uid), values=row_builder(item))
 
         # Context menus
         if context == 'bucket':
@@ -1652,12 +4590,12 @@ class FileSorterApp:
                 self._create_review_tab(f"{bucket.name} ({len(bucket.items)})", bucket.items, context='bucket', bucket=bucket)
 
         # Create pending items tab (unsorted items)
-        pending_items = [f for f in self.files if f.selected and not f.bucket and not f.skipped]
+        pending_items = [f for f in self.files.selected_items() if not f.bucket and not f.skipped]
         if pending_items:
             self._create_review_tab(f"Pending ({len(pending_items)})", pending_items, context='pending')
 
         # Create skipped items tab
-        skipped_items = [f for f in self.files if f.selected and f.skipped]
+        skipped_items = [f for f in self.files.selected_items() if f.skipped]
         if skipped_items:
             self._create_review_tab(f"Skipped ({len(skipped_items)})", skipped_items, context='skipped')
         
@@ -1710,41 +4648,32 @@ class FileSorterApp:
         tree_widget.bind("<Button-3>", on_right_click)
         tree_widget.bind("<Button-2>", on_right_click)
 
+    def _tree_selected_item(self, tree_widget) -> Optional[FileItem]:
+        """Resolve the selected row of a review tree to its FileItem (iid is the item uid)."""
+        selection = tree_widget.selection()
+        return self.files.get(selection[0]) if selection else None
+
     def skip_pending_item(self, tree_widget):
         """Skip selected item from the pending list."""
-        selection = tree_widget.selection()
-        if not selection:
-            return
-        
-        values = tree_widget.item(selection[0], 'values')
-        if values and len(values) > 0:
-            first_value = values[0]
-            for file_item in self.files:
-                if file_item.selected and not file_item.bucket and not file_item.skipped and file_item.name == first_value:
-                    file_item.skipped = True
-                    break
+        file_item = self._tree_selected_item(tree_widget)
+        if file_item and not file_item.bucket:
+            file_item.skipped = True
+            self._journal_event('skip', file_item)
             self.setup_review_interface()
 
     def unskip_item(self, tree_widget):
         """Un-skip selected item from the skipped list."""
-        selection = tree_widget.selection()
-        if not selection:
-            return
-        
-        values = tree_widget.item(selection[0], 'values')
-        if values and len(values) > 0:
-            file_path = values[0]
-            for file_item in self.files:
-                if str(file_item.path) == file_path:
-                    file_item.skipped = False
-                    break
+        file_item = self._tree_selected_item(tree_widget)
+        if file_item:
+            file_item.skipped = False
+            self._journal_event('unskip', file_item)
             self.setup_review_interface()
 
     def update_statistics(self):
         """Update the statistics display."""
         total_items = sum(len(bucket.items) for bucket in self.buckets)
-        total_skipped = sum(1 for f in self.files if f.selected and f.skipped)
-        total_pending = sum(1 for f in self.files if f.selected and not f.bucket and not f.skipped)
+        total_skipped = sum(1 for f in self.files.selected_items() if f.skipped)
+        total_pending = sum(1 for f in self.files.selected_items() if not f.bucket and not f.skipped)
         total_buckets = len([bucket for bucket in self.buckets if bucket.items])
         
         stats_text = f"Total Items Sorted:  {total_items}\n"
@@ -1760,62 +4689,17 @@ class FileSorterApp:
     
     def open_file_from_tree(self, tree_widget):
         """Open file from tree selection."""
-        selection = tree_widget.selection()
-        if selection:
-            values = tree_widget.item(selection[0], 'values')
-            if values and len(values) > 0:
-                # Try to find the actual file item from the tree selection
-                file_item = None
-                
-                # Get the current tab to determine context
-                current_tab = self.review_notebook.tab(self.review_notebook.select(), 'text')
-                
-                # Find the file item by matching the first column value
-                first_value = values[0]
-                
-                # Search through all buckets and skipped items
-                for bucket in self.buckets:
-                    for item in bucket.items:
-                        if item.name == first_value:
-                            file_item = item
-                            break
-                    if file_item:
-                        break
-                
-                # If not found in buckets, check skipped items
-                if not file_item:
-                    for item in self.files:
-                        if item.selected and item.skipped and item.name == first_value:
-                            file_item = item
-                            break
-                
-                # Use the file item's path if found, otherwise fall back to the old method
-                if file_item and hasattr(file_item, 'path'):
-                    self._open_file(str(file_item.path))
-                else:
-                    # Fallback to old method
-                    if self.output_mode_var.get() == 'list':
-                        # In list mode, we can't open files as they might not be actual file paths
-                        messagebox.showwarning("Cannot Open", "This item cannot be opened as a file.")
-                    else:
-                        # In folder mode, second column is Path
-                        path_value = values[1] if len(values) > 1 else values[0]
-                        self._open_file(path_value)
+        file_item = self._tree_selected_item(tree_widget)
+        if file_item:
+            self._open_file(str(file_item.path))
     
     def remove_from_bucket(self, tree_widget, bucket):
         """Remove selected item from bucket and move to pending."""
-        selection = tree_widget.selection()
-        if not selection:
-            return
-        
-        values = tree_widget.item(selection[0], 'values')
-        if values and len(values) > 0:
-            first_value = values[0]
-            for file_item in bucket.items[:]:
-                if file_item.name == first_value:
-                    bucket.items.remove(file_item)
-                    file_item.bucket = None
-                    break
+        file_item = self._tree_selected_item(tree_widget)
+        if file_item and file_item in bucket.items:
+            bucket.items.discard(file_item)
+            file_item.bucket = None
+            self._journal_event('unsort', file_item)
             self.setup_review_interface()
     
     def export_results(self):
@@ -1827,7 +4711,7 @@ class FileSorterApp:
         # Export format dialog
         export_dialog = tk.Toplevel(self.root)
         export_dialog.title("Export Results")
-        export_dialog.geometry("400x300")
+        export_dialog.geometry("400x470")
         export_dialog.transient(self.root)
         export_dialog.grab_set()
         export_dialog.configure(bg=DARK_COLORS['bg'])
@@ -1843,36 +4727,95 @@ class FileSorterApp:
                 bg=DARK_COLORS['bg'], fg='white').pack(pady=10)
                  
         export_format = tk.StringVar(value="json")
-        formats = [("JSON", "json"), ("CSV", "csv"), ("Text Report", "txt"), ("HTML Report", "html")]
+        formats = [("JSON", "json"), ("CSV", "csv"), ("Text Report", "txt"), ("HTML Report", "html"),
+                   ("HTML Report, paged (for large exports)", "html_paged"),
+                   ("NDJSON (typed, one item per line)", "ndjson")]
+        if _optional_module('pyarrow') is not None:
+            formats.append(("Parquet", "parquet"))
         for text, value in formats:
             tk.Radiobutton(export_dialog, text=text, variable=export_format, value=value,
                           bg=DARK_COLORS['bg'], fg='white', selectcolor=DARK_COLORS['entry_bg']).pack(anchor=tk.W, padx=20, pady=5)
         
+        export_progress = ttk.Progressbar(export_dialog, mode='determinate')
+        export_status = tk.StringVar()
+        tk.Label(export_dialog, textvariable=export_status, bg=DARK_COLORS['bg'], fg='white').pack(side=tk.BOTTOM, pady=5)
+        export_job = []
+
         def do_export():
             format_type = export_format.get()
             file_types = {
                 "json": [("JSON files", "*.json")], "csv": [("CSV files", "*.csv")],
-                "txt": [("Text files", "*.txt")], "html": [("HTML files", "*.html")]
+                "txt": [("Text files", "*.txt")], "html": [("HTML files", "*.html")],
+                "html_paged": [("HTML files", "*.html")], "ndjson": [("NDJSON files", "*.ndjson")],
+                "parquet": [("Parquet files", "*.parquet")]
             }
             filename = filedialog.asksaveasfilename(
                 title="Save Export File", filetypes=file_types[format_type],
-                defaultextension=f".{format_type}")
+                defaultextension=file_types[format_type][0][1][1:])
             if filename:
-                try:
-                    export_methods = {
-                        "json": self.export_json, "csv": self.export_csv,
-                        "txt": self.export_txt, "html": self.export_html
-                    }
-                    export_methods[format_type](filename)
-                    messagebox.showinfo("Export Complete", f"Results exported to {filename}")
-                    export_dialog.destroy()
-                except Exception as e:
-                    messagebox.showerror("Export Error", f"Failed to export: {str(e)}")
-        
-        tk.Button(export_dialog, text="Export", command=do_export, 
-                 bg=DARK_COLORS['success'], fg="white").pack(pady=20)
-        tk.Button(export_dialog, text="Cancel", command=export_dialog.destroy, 
+                job = ResultExporter(filename, format_type, *self._export_snapshot())
+                export_job[:] = [job]
+                export_button.configure(state=tk.DISABLED)
+                export_progress.configure(maximum=max(job.total, 1), value=0)
+                export_progress.pack(fill=tk.X, padx=20, pady=(0, 10), before=export_button)
+                export_status.set(f"Exporting {job.total:,} items...")
+                job.start()
+                self.root.after(EXPORT_POLL_MS, poll_export, job)
+
+        def poll_export(job):
+            if not export_dialog.winfo_exists():
+                return  # Closed while exporting, which cancelled the job; it cleans up on its own
+            finished = False
+            errors = []
+            try:
+                while True:
+                    kind, payload = job.queue.get_nowait()
+                    if kind == 'progress':
+                        done, total, nbytes = payload
+                        export_progress.configure(value=done)
+                        export_status.set(f"Exporting... {done:,} / {total:,} items ({nbytes / 1e6:,.1f} MB)")
+                    elif kind == 'error':
+                        errors.append(payload)
+                    elif kind == 'done':
+                        finished = True
+                        break
+            except queue.Empty:
+                pass
+            if not finished:
+                self.root.after(EXPORT_POLL_MS, poll_export, job)
+                return
+            export_job.clear()
+            if job.cancelled or errors:
+                if errors:
+                    messagebox.showerror("Export Error", f"Failed to export: {errors[0]}")
+                export_progress.pack_forget()
+                export_button.configure(state=tk.NORMAL)
+                export_status.set("" if errors else "Export cancelled.")
+            else:
+                rate = job.total / job.elapsed if job.elapsed else 0
+                messagebox.showinfo("Export Complete",
+                                    f"Results exported to {job.filename}\n\n"
+                                    f"{job.total:,} items, {job.bytes_written / 1e6:,.1f} MB in {job.elapsed:.1f} s"
+                                    f" ({rate:,.0f} items/s, {job.bytes_written / 1e6 / max(job.elapsed, 1e-6):,.1f} MB/s)")
+                export_dialog.destroy()
+
+        def cancel_export():
+            if export_job:
+                export_job[0].cancel()  # The poll re-enables the dialog once the writer has stopped
+            else:
+                export_dialog.destroy()
+
+        def close_dialog():
+            if export_job:
+                export_job[0].cancel()
+            export_dialog.destroy()
+
+        export_button = tk.Button(export_dialog, text="Export", command=do_export,
+                                  bg=DARK_COLORS['success'], fg="white")
+        export_button.pack(pady=20)
+        tk.Button(export_dialog, text="Cancel", command=cancel_export, 
                  bg=DARK_COLORS['danger'], fg="white").pack()
+        export_dialog.protocol("WM_DELETE_WINDOW", close_dialog)
     
     def refresh_review(self):
         """Refresh the review interface."""
@@ -1890,269 +4833,267 @@ class FileSorterApp:
     
     def save_session(self, resume_to_last_item: bool = False):
         """Save the current session state."""
+        filename = filedialog.asksaveasfilename(
+            title="Save Session", defaultextension=".json",
+            filetypes=[("JSON files", "*.json"),
+                       ("SortAnything database (faster for large sessions)", f"*{SESSION_DB_EXTENSION}")])
+        if filename:
+            try:
+                if filename.lower().endswith(SESSION_DB_EXTENSION):
+                    SessionDatabase.write(filename, self._session_state(resume_to_last_item, include_files=False),
+                                          self._session_file_records())
+                else:
+                    with open(filename, 'w', encoding='utf-8') as f:
+                        json.dump(self._session_state(resume_to_last_item), f, indent=2)
+                messagebox.showinfo("Session Saved", f"Session saved to {filename}")
+            except Exception as e:
+                messagebox.showerror("Save Error", f"Failed to save session: {str(e)}")
+
+    def _session_state(self, resume_to_last_item=False, include_files=True):
+        """The session as a JSON-serializable dict (saved sessions and autosave snapshots).
+
+        Without ``include_files`` the "files" list is left empty; the records
+        then come from _session_file_records().
+        """
         session_data = {
             "version": "1.0", "save_date": datetime.now().isoformat(),
             "current_phase": self.current_phase, "directories": list(self.dir_listbox.get(0, tk.END)),
             "files": [], "buckets": [], "current_file_index": self.current_file_index,
             "output_mode": self.output_mode, "output_directory": self.output_directory,
-            "resume_to_last_item": bool(resume_to_last_item)
+            "resume_to_last_item": bool(resume_to_last_item),
+            "scan_options": {"recursive": self.scan_recursive.get(), "max_depth": self.scan_max_depth.get(),
+                             "include": self.scan_include.get(), "exclude": self.scan_exclude.get()},
+            "columns_mode": self.columns_mode, "csv_headers": self.csv_headers,
+            "list_items_are_paths": self._list_items_are_paths
         }
         
         # Save selected file data
-        for file_item in self.files:
-            if file_item.selected:
-                file_data = {
-                    "path": str(file_item.path), "selected": file_item.selected,
-                    "bucket_number": file_item.bucket.number if file_item.bucket else None,
-                    "skipped": file_item.skipped
-                }
-                if file_item.attributes:
-                    file_data["attributes"] = file_item.attributes
-                session_data["files"].append(file_data)
-        
+        if include_files:
+            session_data["files"].extend(self._session_file_records())
+    
         # Save bucket data
         for bucket in self.buckets:
             session_data["buckets"].append({
                 "number": bucket.number, "name": bucket.name, "color": bucket.color
             })
-            
-        filename = filedialog.asksaveasfilename(
-            title="Save Session", filetypes=[("JSON files", "*.json")], defaultextension=".json")
-        if filename:
-            try:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(session_data, f, indent=2)
-                messagebox.showinfo("Session Saved", f"Session saved to {filename}")
-            except Exception as e:
-                messagebox.showerror("Save Error", f"Failed to save session: {str(e)}")
+        return session_data
+
+    def _session_file_records(self):
+        """Yield a session record for each selected item, in sorting order."""
+        for file_item in self.files.selected_items():
+            file_data = {
+                "path": str(file_item.path), "selected": file_item.selected,
+                "bucket_number": file_item.bucket.number if file_item.bucket else None,
+                "skipped": file_item.skipped
+            }
+            if file_item.attributes:
+                file_data["attributes"] = file_item.attributes
+            yield file_data
     
     def load_session(self):
         """Load a saved session."""
         filename = filedialog.askopenfilename(
-            title="Load Session", filetypes=[("JSON files", "*.json")])
+            title="Load Session",
+            filetypes=[("Sessions", f"*{SESSION_DB_EXTENSION} *.json"), ("All files", "*.*")])
         if not filename:
             return
         
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                session_data = json.load(f)
-            
-            # Restore state
-            self.current_phase = session_data.get("current_phase", 1)
-            self.current_file_index = session_data.get("current_file_index", 0)
-            self.output_mode = session_data.get("output_mode", "list")
-            self.output_directory = session_data.get("output_directory", "")
-            
-            # Restore directories
-            self.dir_listbox.delete(0, tk.END)
-            for directory in session_data.get("directories", []):
-                self.dir_listbox.insert(tk.END, directory)
-                
-            # Restore files
-            self.files.clear()
-            for file_data in session_data.get("files", []):
-                if os.path.exists(file_data["path"]):
-                    file_item = FileItem(file_data["path"])
-                    file_item.selected = file_data.get("selected", False)
-                    file_item.skipped = file_data.get("skipped", False)
-                    if "attributes" in file_data:
-                        file_item.attributes = file_data["attributes"]
-                    self.files.append(file_item)
-                    
-            # Restore buckets
-            bucket_data_list = session_data.get("buckets", [])
-            if bucket_data_list:
-                self.buckets = [Bucket(bd["number"], bd["name"], bd["color"]) for bd in bucket_data_list]
-                
-                # Restore file-bucket assignments
-                for file_data in session_data.get("files", []):
-                    if file_data.get("bucket_number"):
-                        for file_item in self.files:
-                            if str(file_item.path) == file_data["path"]:
-                                bucket = next((b for b in self.buckets 
-                                             if b.number == file_data["bucket_number"]), None)
-                                if bucket:
-                                    file_item.bucket = bucket
-                                    bucket.items.append(file_item)
-                                    
-            # Update UI
-            self.output_mode_var.set(self.output_mode)
-            self.output_dir_var.set(self.output_directory)
-            self.refresh_display()
-            self.update_bucket_config()
-            
-            # Resume to last item if requested
-            if session_data.get("resume_to_last_item"):
-                self.setup_sorting_interface()
-                self.notebook.select(2)
-                self.show_current_file()
-            
+            if SessionDatabase.is_database(filename):
+                session_data, count = SessionDatabase.read_state(filename)
+                records = SessionDatabase.records(filename)
+            else:
+                with open(filename, 'r', encoding='utf-8') as f:
+                    session_data = json.load(f)
+                records = count = None
+            self._apply_session(session_data, records=records, count=count,
+                                on_loaded=lambda: self._autosave_snapshot(
+                                    session_data.get("resume_to_last_item", False)))
          #   messagebox.showinfo("Session Loaded", f"Session loaded from {filename}")
         except Exception as e:
             messagebox.showerror("Load Error", f"Failed to load session: {str(e)}")
 
-    def export_json(self, filename):
-        """Export results to JSON format."""
-        export_data = {
-            "export_date": datetime.now().isoformat(),
-            "buckets": [], "skipped_items": []
-        }
-        
-        for bucket in self.buckets:
-            bucket_data = {"name": bucket.name, "color": bucket.color, "items": []}
-            for item in bucket.items:
-                item_data = {
-                    "name": item.name, "path": str(item.path), "size": item.size,
-                    "modified": item.modified.isoformat(), "is_file": item.is_file
-                }
-                if item.attributes:
-                    item_data["attributes"] = item.attributes
-                bucket_data["items"].append(item_data)
-            export_data["buckets"].append(bucket_data)
-        
-        # Export skipped items
-        for item in [f for f in self.files if f.selected and f.skipped]:
-            item_data = {
-                "name": item.name, "path": str(item.path), "size": item.size,
-                "modified": item.modified.isoformat(), "is_file": item.is_file
-            }
-            if item.attributes:
-                item_data["attributes"] = item.attributes
-            export_data["skipped_items"].append(item_data)
+    def _apply_session(self, session_data, journal_records=(), on_loaded=None, records=None, count=None):
+        """Restore a session dict, replaying autosave journal records on top of it.
+
+        Settings are restored at once; the items are rebuilt by a background
+        SessionLoader (with progress in Phase 1), from ``records``/``count``
+        when given (a SessionDatabase) and from session_data["files"]
+        otherwise. Sorting resumes as soon as the items up to the saved
+        position are in, unless journal records have to be replayed first.
+        """
+        # Restore state
+        self.current_phase = session_data.get("current_phase", 1)
+        self.current_file_index = session_data.get("current_file_index", 0)
+        self.output_mode = session_data.get("output_mode", "list")
+        self.output_directory = session_data.get("output_directory", "")
         
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2)
-    
-    def export_csv(self, filename):
-        """Export results to CSV format."""
-        with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(['Category', 'Bucket', 'Item Name', 'Full Path', 'Size', 'Modified', 'Type'])
-            
-            for bucket in self.buckets:
-                for item in bucket.items:
-                    size_str = f"{item.size:,}" if item.is_file else "N/A"
-                    modified_str = item.modified.strftime("%Y-%m-%d %H:%M:%S")
-                    type_str = "File" if item.is_file else "Folder"
-                    writer.writerow(['Sorted', bucket.name, item.name, str(item.path), 
-                                   size_str, modified_str, type_str])
-            
-            for item in [f for f in self.files if f.selected and f.skipped]:
-                size_str = f"{item.size:,}" if item.is_file else "N/A"
-                modified_str = item.modified.strftime("%Y-%m-%d %H:%M:%S")
-                type_str = "File" if item.is_file else "Folder"
-                writer.writerow(['Skipped', 'N/A', item.name, str(item.path), 
-                               size_str, modified_str, type_str])
-    
-    def export_txt(self, filename):
-        """Export results to text format."""
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(f"SortAnything Results\n")
-            f.write(f"Export Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write("=" * 50 + "\n\n")
-            
-            for bucket in self.buckets:
-                if bucket.items:
-                    f.write(f"BUCKET: {bucket.name}\n" + "-" * 30 + "\n")
-                    for item in bucket.items:
-                        f.write(f"  {item.name}\n    Path: {item.path}\n")
-                        if item.is_file:
-                            f.write(f"    Size: {item.size:,} bytes\n")
-                        f.write(f"    Modified: {item.modified.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                        if item.attributes:
-                            for key, value in item.attributes.items():
-                                f.write(f"    {key}: {value}\n")
-                        f.write("\n")
-                    f.write("\n")
+        # Restore directories
+        self.dir_listbox.delete(0, tk.END)
+        for directory in session_data.get("directories", []):
+            self.dir_listbox.insert(tk.END, directory)
+        scan_options = session_data.get("scan_options", {})
+        self.scan_recursive.set(scan_options.get("recursive", False))
+        self.scan_max_depth.set(scan_options.get("max_depth", ""))
+        self.scan_include.set(scan_options.get("include", ""))
+        self.scan_exclude.set(scan_options.get("exclude", ""))
             
-            skipped_items = [f for f in self.files if f.selected and f.skipped]
-            if skipped_items:
-                f.write("SKIPPED ITEMS\n" + "-" * 30 + "\n")
-                for item in skipped_items:
-                    f.write(f"  {item.name}\n    Path: {item.path}\n")
-                    if item.is_file:
-                        f.write(f"    Size: {item.size:,} bytes\n")
-                    f.write(f"    Modified: {item.modified.strftime('%Y-%m-%d %H:%M:%S')}\n")
-                    if item.attributes:
-                        for key, value in item.attributes.items():
-                            f.write(f"    {key}: {value}\n")
-                    f.write("\n")
-    
-    def export_html(self, filename):
-        """Export results to HTML format."""
-        html_template = f"""<!DOCTYPE html>
-<html>
-<head>
-    <title>SortAnything Results</title>
-    <style>
-        body {{ font-family: Arial, sans-serif; margin: 20px; background-color: {DARK_COLORS['bg']}; color: {DARK_COLORS['fg']}; }}
-        .bucket {{ margin-bottom: 30px; border: 1px solid #555; padding: 15px; }}
-        .bucket-header {{ background-color: {DARK_COLORS['entry_bg']}; padding: 10px; margin: -15px -15px 15px -15px; }}
-        .item {{ margin-bottom: 10px; padding: 10px; background-color: {DARK_COLORS['entry_bg']}; }}
-        .item-name {{ font-weight: bold; }}
-        .item-details {{ color: #ccc; font-size: 0.9em; }}
-        .skipped-section {{ margin-top: 30px; }}
-    </style>
-</head>
-<body>
-    <h1>SortAnything Results</h1>
-    <p>Export Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-"""
-        
+        # Restore files (in the background) and buckets
+        self._cancel_scan()
+        self.files.clear()
+        self.columns_mode = session_data.get("columns_mode", 'folder')
+        self.csv_headers = session_data.get("csv_headers")
+        list_items_are_paths = session_data.get("list_items_are_paths", False)
+        if self.input_mode_var.get() != self.columns_mode:
+            self.input_mode_var.set(self.columns_mode)
+            self._show_input_controls(self.columns_mode)
+        bucket_data_list = session_data.get("buckets", [])
+        if bucket_data_list:
+            self.buckets = [Bucket(bd["number"], bd["name"], bd["color"]) for bd in bucket_data_list]
         for bucket in self.buckets:
-            if bucket.items:
-                html_template += f"""
-    <div class="bucket">
-        <div class="bucket-header" style="background-color: {bucket.color};">
-            <h2>{bucket.name} ({len(bucket.items)} items)</h2>
-        </div>
-"""
-                for item in bucket.items:
-                    size_str = f"{item.size:,} bytes" if item.is_file else "Folder"
-                    html_template += f"""
-        <div class="item">
-            <div class="item-name">{item.name}</div>
-            <div class="item-details">
-                Path: {item.path}<br>
-                Size: {size_str}<br>
-                Modified: {item.modified.strftime('%Y-%m-%d %H:%M:%S')}
-"""
-                    if item.attributes:
-                        for key, value in item.attributes.items():
-                            html_template += f"<br>{key}: {value}"
-                    html_template += "            </div>\n        </div>\n"
-                html_template += "    </div>\n"
-        
-        skipped_items = [f for f in self.files if f.selected and f.skipped]
-        if skipped_items:
-            html_template += f"""
-    <div class="skipped-section">
-        <div class="bucket">
-            <div class="bucket-header">
-                <h2>Skipped Items ({len(skipped_items)} items)</h2>
-            </div>
-"""
-            for item in skipped_items:
-                size_str = f"{item.size:,} bytes" if item.is_file else "Folder"
-                html_template += f"""
-            <div class="item">
-                <div class="item-name">{item.name}</div>
-                <div class="item-details">
-                    Path: {item.path}<br>
-                    Size: {size_str}<br>
-                    Modified: {item.modified.strftime('%Y-%m-%d %H:%M:%S')}
-"""
-                if item.attributes:
-                    for key, value in item.attributes.items():
-                        html_template += f"<br>{key}: {value}"
-                html_template += "                </div>\n            </div>\n"
-            html_template += "        </div>\n    </div>\n"
-        
-        html_template += "</body>\n</html>"
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(html_template)
-    
+            bucket.items.clear()
+        if records is None:
+            records = session_data.get("files", [])
+            count = len(records)
+        resume = session_data.get("resume_to_last_item", False)
+        job = SessionLoader(records, count, {bucket.number: bucket for bucket in self.buckets},
+                            check_paths=self.columns_mode != 'list' or list_items_are_paths,
+                            ready_at=self.current_file_index if resume and not journal_records else None)
+        self._list_items_are_paths = list_items_are_paths
+        self._scan_job = job
+        self._show_progress(count)
+        self.output_mode_var.set(self.output_mode)
+        self.output_dir_var.set(self.output_directory)
+        self.refresh_display()
+        job.start()
+        resumed = []
+
+        def resume_sorting():
+            if not resumed:
+                resumed.append(True)
+                self.setup_sorting_interface()
+                self.notebook.select(2)
+            self.show_current_file()
+
+        def loaded():
+            self._list_items_are_paths = list_items_are_paths
+            self._replay_journal(journal_records)
+            self.refresh_display()
+            self.update_bucket_config()
+            if resume:
+                resume_sorting()  # Again if resumed early: the queue is complete now
+            if on_loaded is not None:
+                on_loaded()
+
+        self.root.after(SCAN_POLL_MS, self._poll_scan, job, loaded, resume_sorting)
+
+    def _bucket_signature(self):
+        return tuple((b.number, b.name, b.color) for b in self.buckets)
+
+    def _autosave_snapshot(self, resume_to_last_item=True):
+        """Replace the autosave snapshot with the current session and empty the journal.
+
+        Skipped while a SessionLoader is running: the items are still partial,
+        and the session is snapshotted when loading finishes.
+        """
+        if self.session_journal is not None and not isinstance(self._scan_job, SessionLoader):
+            self.session_journal.compact(self._session_state(resume_to_last_item))
+            self._journal_buckets = self._bucket_signature()
+
+    def _journal_event(self, op, item, **fields):
+        """Autosave one sorting event: O(1) here, written by the journal's background thread.
+
+        Records name the item by path and position in the sorting queue and
+        carry the queue index, so replaying them restores the sorting state.
+        """
+        journal = self.session_journal
+        if journal is None:
+            return
+        if isinstance(self._scan_job, SessionLoader):
+            return  # Sorting resumed early; the snapshot taken once loading finishes covers it
+        if not journal.has_snapshot or self._journal_buckets != self._bucket_signature():
+            self._autosave_snapshot()  # Records only make sense on top of a matching snapshot
+        journal.record(op, p=str(item.path), n=self.files.selected_position(item),
+                       i=self.current_file_index, **fields)
+        if journal.records_since_compaction >= JOURNAL_COMPACT_RECORDS:
+            self._autosave_snapshot()
+
+    def _replay_journal(self, records):
+        """Apply autosave journal records (see _journal_event) to the restored items."""
+        if not records:
+            return
+        selected_files = self.files.selected_items()
+        by_path = {}
+        for item in selected_files:
+            by_path.setdefault(str(item.path), item)
+        buckets = {bucket.number: bucket for bucket in self.buckets}
+        for record in records:
+            path, position = record.get('p'), record.get('n')
+            if isinstance(position, int) and 0 <= position < len(selected_files) \
+                    and str(selected_files[position].path) == path:
+                item = selected_files[position]
+            else:
+                item = by_path.get(path)
+            if item is None:
+                continue
+            op = record.get('op')
+            if op == 'sort':
+                bucket = buckets.get(record.get('b'))
+                if bucket is None:
+                    continue
+                if item.bucket:
+                    item.bucket.items.discard(item)
+                bucket.items.add(item)
+                item.bucket = bucket
+                item.skipped = False
+            elif op in ('skip', 'unsort'):
+                if item.bucket:
+                    item.bucket.items.discard(item)
+                    item.bucket = None
+                if op == 'skip':
+                    item.skipped = True
+            elif op == 'unskip':
+                item.skipped = False
+            if isinstance(record.get('i'), int):
+                self.current_file_index = record['i']
+
+    def offer_recovery(self):
+        """Offer to restore an autosave left behind by a session that did not close properly."""
+        leftovers = SessionJournal.leftovers()
+        if not leftovers:
+            return
+        try:
+            state, records = SessionJournal.read(leftovers[0])
+        except (OSError, ValueError):
+            state = None
+        if state is not None:
+            saved = state.get("save_date", "")[:19].replace('T', ' ')
+            if messagebox.askyesno("Recover Session",
+                                   "SortAnything did not close properly last time.\n\n"
+                                   f"Recover the autosaved session from {saved}"
+                                   f" (plus {len(records)} later sorting step(s))?\n"
+                                   "Choosing No discards it."):
+                def recovered():
+                    self._autosave_snapshot(state.get("resume_to_last_item", False))
+                    self._discard_leftovers(leftovers)
+                try:
+                    self._apply_session(state, records, on_loaded=recovered)
+                except Exception as e:
+                    messagebox.showerror("Recovery Error", f"Failed to recover session: {e}")
+                return  # Keep the files until the items are restored
+        self._discard_leftovers(leftovers)
+
+    @staticmethod
+    def _discard_leftovers(leftovers):
+        for path in leftovers:
+            SessionJournal.discard(path)
+
+    def _export_snapshot(self):
+        """(buckets, skipped) for a ResultExporter, copied so sorting can go on meanwhile."""
+        buckets = [(bucket.name, bucket.color, list(bucket.items)) for bucket in self.buckets]
+        skipped = [f for f in self.files.selected_items() if f.skipped]
+        return buckets, skipped
+
     def execute_file_moves(self):
         """Execute the actual file moves to bucket folders."""
         if self.output_mode != "folder":
@@ -2242,8 +5183,13 @@ def main():
     
     app = FileSorterApp(root)
     create_menu_bar(root, app)
+    root.after_idle(app.offer_recovery)
     
     root.mainloop()
+    try:
+        root.destroy()  # After File > Exit; runs the clean-shutdown handlers
+    except tk.TclError:
+        pass
 
 if __name__ == "__main__":
     main()